@@ -2,20 +2,45 @@ import streamlit as st
 from streamlit_option_menu import option_menu
 from datetime import datetime
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 import time
+import metrics
+import profiling
+import session_cookie
+from auth import HR_ACCOUNT_COLUMNS, SEARCH_MIN_LENGTH, USER_ACCOUNT_COLUMNS
+from export import export_bytes
+from figures import cached_figure, figure_cache_stats
+from downsample import bin_counts, reduce_series
+
+
+SEARCH_RESULTS = 200
 
 
 def admin_view(auth_service):
+    options = ["User Statistics", "HR Statistics","Manage HR", "Register HR", "Import Accounts", "Export Accounts", "Manage Users", "Logout"]
+    icons = ["bar-chart", "bar-chart","people", "person-plus", "upload", "download", "person",  "box-arrow-right"]
+    if metrics.ENABLED or profiling.is_enabled():
+        # Only listed while metrics or rerun profiling are on.
+        options.insert(-1, "Performance")
+        icons.insert(-1, "speedometer2")
     with st.sidebar:
         selected = option_menu(
             menu_title="Admin Menu",
-            options=["User Statistics", "HR Statistics","Manage HR", "Register HR", "Manage Users", "Logout"],
-            icons=["bar-chart", "bar-chart","people", "person-plus", "person",  "box-arrow-right"],
+            options=options,
+            icons=icons,
             menu_icon="gear",
             default_index=0,
             orientation="vertical",
         )
+        st.toggle(
+            "Profile reruns",
+            value=profiling.is_enabled(),
+            key="profile_reruns",
+            on_change=lambda: profiling.set_enabled(st.session_state["profile_reruns"]),
+            help="Profile every rerun of the app, for all sessions, and list the slowest on the Performance page.",
+        )
+    profiling.tag(page=selected)
 
 
     @st.dialog("Confirm Deletion")
@@ -59,27 +84,146 @@ def admin_view(auth_service):
             except Exception as e:
                 st.error(f"An unexpected error occurred: {e}")
 
-    def search_accounts(accounts, search_query):
-        if not search_query:
-            return accounts
+    @st.dialog("Confirm Batch Action")
+    def confirm_batch_action(action, accounts, role):
+        usernames = ", ".join(account[2] for account in accounts[:10])
+        if len(accounts) > 10:
+            usernames += f" and {len(accounts) - 10} more"
+        account_ids = [account[0] for account in accounts]
 
-        search_query_lower = search_query.lower()
-        return [
-            acc for acc in accounts
-            if any(
-                search_query_lower in str(field).lower() if field else ""
-                for field in acc[:5]
+        if action == "Delete":
+            st.warning(f"Delete {len(accounts)} {role} accounts ({usernames})? This action cannot be undone.")
+        elif action == "Reset Passwords":
+            st.warning(
+                f"Reset the passwords of {len(accounts)} {role} accounts ({usernames})? "
+                "They will be logged out everywhere."
+            )
+        else:
+            st.write(f"Reassign {len(accounts)} {role} accounts ({usernames}) to a new industry.")
+            industry = st.selectbox("Industry", ["Software", "Finance", "Healthcare", "Education"])
+
+        if st.button(f"Yes, {action}", type="primary"):
+            try:
+                if action == "Delete":
+                    deleted = auth_service.delete_users(account_ids)
+                    st.session_state["batch_result"] = (f"Deleted {deleted} {role} accounts.", None)
+                elif action == "Reset Passwords":
+                    reset = auth_service.reset_passwords(account_ids)
+                    credentials = pd.DataFrame(
+                        [(username, password) for _, username, password in reset],
+                        columns=["username", "temporary_password"],
+                    )
+                    st.session_state["batch_result"] = (
+                        f"Reset the passwords of {len(reset)} {role} accounts.", credentials.to_csv(index=False)
+                    )
+                else:
+                    updated = auth_service.update_industries({account_id: industry for account_id in account_ids})
+                    st.session_state["batch_result"] = (f"Moved {updated} {role} accounts to {industry}.", None)
+            except ValueError as e:
+                st.error(str(e))
+                return
+            st.session_state.pop(f"batch_selection_{role.lower()}", None)
+            st.rerun()
+
+    def display_batch_actions(accounts, role):
+        result = st.session_state.pop("batch_result", None)
+        if result:
+            message, credentials_csv = result
+            st.success(message)
+            if credentials_csv:
+                st.download_button(
+                    label="📥 Download Temporary Passwords",
+                    data=credentials_csv,
+                    file_name=f"{role.lower()}_temporary_passwords.csv",
+                    mime="text/csv",
+                )
+
+        accounts_by_id = {account[0]: account for account in accounts}
+        col1, col2, col3 = st.columns([0.6, 0.25, 0.15], vertical_alignment="bottom")
+        with col1:
+            selected_ids = st.multiselect(
+                "Select Accounts",
+                list(accounts_by_id),
+                format_func=lambda account_id: f"{accounts_by_id[account_id][2]} ({accounts_by_id[account_id][3]})",
+                key=f"batch_selection_{role.lower()}",
+                placeholder="Choose accounts for a batch action",
             )
-        ]
+        with col2:
+            actions = ["Delete", "Reset Passwords"] + (["Change Industry"] if role == "User" else [])
+            action = st.selectbox("Batch Action", actions, key=f"batch_action_{role.lower()}")
+        with col3:
+            apply = st.button("Apply", disabled=not selected_ids, use_container_width=True)
+        if apply:
+            confirm_batch_action(action, [accounts_by_id[account_id] for account_id in selected_ids], role)
 
     def display_search(role):
-        search_query = st.text_input("Search Accounts", placeholder="Search by name, username, email, etc.")
+        # The input only reruns the page on Enter or blur, and terms shorter than
+        # SEARCH_MIN_LENGTH never reach the database, so typing does not fire a query per key.
+        search_query = st.text_input(
+            "Search Accounts", placeholder="Search by name, username, email, etc.", key=f"search_{role.lower()}"
+        ).strip()
+        if search_query and len(search_query) < SEARCH_MIN_LENGTH:
+            st.caption(f"Type at least {SEARCH_MIN_LENGTH} characters to search.")
+            return ""
+        if search_query and not auth_service.search_is_indexed():
+            st.caption(
+                "⚠️ The search index is missing (the pg_trgm extension is not installed), "
+                "so every search scans all accounts."
+            )
         return search_query
 
-    def display_accounts(accounts, role):
+    def load_page(role, search_query, cursor, page_size):
+        """Return one page of accounts and the cursor of the next page (None on the last page)."""
+        if search_query:
+            # Search returns the best SEARCH_RESULTS matches at once, so its cursor is a plain offset.
+            matches = auth_service.search_accounts(role, search_query, limit=SEARCH_RESULTS)
+            offset = cursor or 0
+            next_offset = offset + page_size
+            return matches[offset:next_offset], next_offset if next_offset < len(matches) else None
+        if role == "User":
+            return auth_service.get_user_accounts_page(cursor, page_size)
+        return auth_service.get_hr_accounts_page(cursor, page_size)
+
+    def display_page_controls(role, cursors, next_cursor):
+        col1, col2, col3 = st.columns([0.2, 0.6, 0.2], vertical_alignment="center")
+        with col1:
+            st.button(
+                "◀ Previous",
+                key=f"previous_page_{role.lower()}",
+                disabled=len(cursors) == 1,
+                on_click=cursors.pop,
+                use_container_width=True,
+            )
+        with col2:
+            st.markdown(f"<p style='text-align: center'>Page {len(cursors)}</p>", unsafe_allow_html=True)
+        with col3:
+            st.button(
+                "Next ▶",
+                key=f"next_page_{role.lower()}",
+                disabled=next_cursor is None,
+                on_click=cursors.append,
+                args=(next_cursor,),
+                use_container_width=True,
+            )
+
+    def display_accounts(role):
         st.header(f"Manage {role} Accounts", divider="blue")
-        search_query = display_search(role)
-        searched_accounts = search_accounts(accounts, search_query)
+        col1, col2 = st.columns([0.85, 0.15], vertical_alignment="bottom")
+        with col1:
+            search_query = display_search(role)
+        with col2:
+            page_size = st.selectbox("Per Page", [25, 50, 100], index=1, key=f"page_size_{role.lower()}")
+
+        # The page history holds the cursor of every page visited so far; it restarts
+        # whenever the search or the page size changes.
+        view_key, cursors_key = f"page_view_{role.lower()}", f"page_cursors_{role.lower()}"
+        if st.session_state.get(view_key) != (search_query, page_size):
+            st.session_state[view_key] = (search_query, page_size)
+            st.session_state[cursors_key] = [None]
+        cursors = st.session_state[cursors_key]
+
+        searched_accounts, next_cursor = load_page(role, search_query, cursors[-1], page_size)
+        display_batch_actions(searched_accounts, role)
 
         st.write("")
 
@@ -152,6 +296,12 @@ def admin_view(auth_service):
                     elif action == "Update":
                         update_account(account_id, username, email, full_name, industry if role == "User" else None, role)
 
+            st.write("---")
+            display_page_controls(role, cursors, next_cursor)
+
+        elif len(cursors) > 1:
+            st.info("This page is empty.")
+            display_page_controls(role, cursors, next_cursor)
         else:
             st.info(f"No {role} accounts match the search query.")
 
@@ -207,139 +357,337 @@ def admin_view(auth_service):
                 mime="text/plain",
             )
 
+    def import_accounts():
+        st.write(
+            "Upload a CSV or Parquet file with the columns **full_name**, **username**, **email**, "
+            "**password** and, for Users, **industry**."
+        )
+        role = st.selectbox("Account Type", ["User", "HR"], key="import_role")
+        uploaded_file = st.file_uploader("Accounts File", type=["csv", "parquet"], key="import_file")
+
+        if uploaded_file is not None and st.button("Import Accounts", type="primary"):
+            try:
+                if uploaded_file.name.endswith(".parquet"):
+                    accounts_df = pd.read_parquet(uploaded_file)
+                else:
+                    accounts_df = pd.read_csv(uploaded_file, dtype=str, keep_default_na=False)
+            except ImportError:
+                st.error("Reading Parquet files requires pyarrow to be installed.")
+                return
+            except Exception as e:
+                st.error(f"Could not read the file: {e}")
+                return
+
+            accounts_df = accounts_df.astype(object).where(accounts_df.notna(), None)
+            with st.spinner(f"Importing {len(accounts_df)} accounts..."):
+                started = time.perf_counter()
+                try:
+                    report = auth_service.bulk_import(accounts_df.to_dict("records"), role_name=role)
+                except Exception as e:
+                    st.error(f"An unexpected error occurred: {e}")
+                    return
+                elapsed = time.perf_counter() - started
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Imported", report["inserted"])
+            with col2:
+                st.metric("Failed", report["failed"])
+            with col3:
+                st.metric("Time", f"{elapsed:.1f} s")
+
+            if report["errors"]:
+                errors_df = pd.DataFrame(report["errors"])
+                if "username" in accounts_df:
+                    errors_df.insert(1, "username", accounts_df["username"].iloc[errors_df["row"] - 1].to_numpy())
+                st.dataframe(errors_df, use_container_width=True, hide_index=True)
+                st.download_button(
+                    label="📥 Download Error Report",
+                    data=errors_df.to_csv(index=False),
+                    file_name="import_errors.csv",
+                    mime="text/csv",
+                )
+            else:
+                st.success(f"All {report['inserted']} {role} accounts were imported.")
+
+    def export_accounts():
+        st.write(
+            "Download every account of a role for audits. The export is built from the database "
+            "when the download starts, so it always reflects the current accounts."
+        )
+        role = st.selectbox("Account Type", ["User", "HR"], key="export_role")
+        file_format = st.radio("Format", ["CSV", "Parquet"], horizontal=True, key="export_format")
+        if role == "HR":
+            rows, columns = auth_service.iter_hr_accounts, HR_ACCOUNT_COLUMNS
+        else:
+            rows, columns = auth_service.iter_user_accounts, USER_ACCOUNT_COLUMNS
+
+        def build_export():
+            # Runs only when the button is clicked. Rows are read in server-side batches, but
+            # Streamlit serves the download from memory, so the encoded file is held whole.
+            return export_bytes(rows(), columns, file_format)
+
+        extension = "parquet" if file_format == "Parquet" else "csv"
+        st.download_button(
+            label=f"📥 Download {role} Accounts",
+            data=build_export,
+            file_name=f"{role.lower()}_accounts_{datetime.now():%Y%m%d}.{extension}",
+            mime="application/vnd.apache.parquet" if file_format == "Parquet" else "text/csv",
+            type="primary",
+        )
+
+    def display_slowest_reruns():
+        st.subheader("Slowest Reruns")
+        reruns = profiling.slowest()
+        if not reruns:
+            st.info("No reruns profiled yet.")
+            return
+        st.dataframe(pd.DataFrame(reruns), use_container_width=True, hide_index=True)
+        st.caption(f"Profiles are written to `{profiling.PROFILE_DIR}`; open one with `snakeviz` or `flameprof`.")
+
+    def display_performance():
+        if profiling.is_enabled() or profiling.slowest(1):
+            display_slowest_reruns()
+        if not metrics.ENABLED:
+            return
+        snapshot = metrics.snapshot()
+        st.subheader("Queries")
+        if snapshot["queries"]:
+            queries_df = pd.DataFrame(snapshot["queries"]).sort_values("total_ms", ascending=False)
+            st.dataframe(queries_df.round(2), use_container_width=True, hide_index=True)
+        else:
+            st.info("No queries recorded yet.")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Connection Acquire")
+            if snapshot["acquires"]:
+                st.dataframe(pd.DataFrame(snapshot["acquires"]).round(2), use_container_width=True, hide_index=True)
+        with col2:
+            st.subheader("Errors")
+            if snapshot["errors"]:
+                st.dataframe(pd.DataFrame(snapshot["errors"]), use_container_width=True, hide_index=True)
+            else:
+                st.write("None recorded.")
+
+        st.subheader("Caches")
+        caches = {
+            "Account listings": auth_service.listing_cache_stats(),
+            "Figures": figure_cache_stats(),
+            "Sessions": auth_service.sessions.cache_stats(),
+        }
+        st.dataframe(pd.DataFrame.from_dict(caches, orient="index"), use_container_width=True)
+        pool_stats = auth_service.db.pool_stats()
+        if pool_stats:
+            st.subheader("Connection Pool")
+            st.json({key: value for key, value in pool_stats.items() if key != "replicas"}, expanded=False)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="📥 Download Prometheus Snapshot",
+                data=lambda: metrics.render(auth_service.db.pool_stats()),
+                file_name=f"hirezy_metrics_{datetime.now():%Y%m%d_%H%M%S}.prom",
+                mime="text/plain",
+            )
+        with col2:
+            if st.button("Reset Metrics"):
+                metrics.reset()
+                st.rerun()
+
+    def registrations_frame(stats):
+        """Daily registration counts per industry, with calendar columns for grouping."""
+        daily = pd.DataFrame(stats["daily"], columns=["Day", "Industry", "Count"])
+        daily["Day"] = pd.to_datetime(daily["Day"])
+        daily["Year"] = daily["Day"].dt.year
+        daily["Month"] = daily["Day"].dt.month
+        return daily
+
+    def cumulative_frame(daily):
+        totals = daily.groupby("Day", as_index=False)["Count"].sum()
+        totals["Total"] = totals["Count"].cumsum()
+        totals["Share"] = totals["Total"] / totals["Count"].sum()
+        return totals
+
+    def show_figure(name, data, build):
+        st.plotly_chart(cached_figure(name, data, build), use_container_width=True)
+
+    def month_boxes(month_quartiles):
+        # Quartiles come precomputed from Postgres, so the box is drawn from them directly.
+        fig = go.Figure()
+        for industry, (low, q1, median, q3, high) in month_quartiles:
+            fig.add_trace(go.Box(
+                name=industry or "Unknown", q1=[q1], median=[median], q3=[q3], lowerfence=[low], upperfence=[high]
+            ))
+        fig.update_layout(title="Registration Month by Industry", showlegend=False)
+        return fig
+
+    def date_box(date_quartiles):
+        low, q1, median, q3, high = date_quartiles
+        fig = go.Figure(go.Box(name="Registered At", q1=[q1], median=[median], q3=[q3], lowerfence=[low], upperfence=[high]))
+        fig.update_layout(title="HR Registration Date Spread")
+        return fig
+
     def show_user_statistics():
         st.header("User Statistics", divider="blue")
-        user_data = auth_service.get_all_user_accounts()
-        df = pd.DataFrame(user_data, columns=["ID", "Name", "Username", "Email", "Industry", "Registered At"])
-        df["Registered At"] = pd.to_datetime(df["Registered At"])
+        stats = auth_service.registration_statistics("User", top_names=0)
+        if not stats["total"]:
+            st.info("No users have registered yet.")
+            return
+        daily = registrations_frame(stats)
+        by_industry = (
+            daily.groupby("Industry", as_index=False)["Count"].sum().sort_values("Count", ascending=False)
+        )
+        by_year = daily.groupby(["Year", "Industry"], as_index=False)["Count"].sum()
+        totals = cumulative_frame(daily)
     
         st.write("### Overview Metrics")
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
-            st.metric("Total Users", len(df))
+            st.metric("Total Users", stats["total"])
         with col2:
-            st.metric("Industries Covered", df["Industry"].nunique())
+            st.metric("Industries Covered", stats["industries"])
         with col3:
-            st.metric("Most Popular Industry", df["Industry"].mode()[0])
+            st.metric("Most Popular Industry", stats["top_industry"])
         with col4:
-            st.metric("Latest Registration", df["Registered At"].max().strftime("%Y-%m-%d"))
+            st.metric("Latest Registration", stats["latest"].strftime("%Y-%m-%d"))
         with col5:
-            st.metric("Earliest Registration", df["Registered At"].min().strftime("%Y-%m-%d"))
+            st.metric("Earliest Registration", stats["earliest"].strftime("%Y-%m-%d"))
     
         st.write("## Charts")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            fig1 = px.histogram(df, x="Industry", title="User Count by Industry")
-            st.plotly_chart(fig1, use_container_width=True)
-    
-        with col2:
-            fig2 = px.line(df.sort_values("Registered At"), x="Registered At", title="User Registration Over Time")
-            st.plotly_chart(fig2, use_container_width=True)
-    
-        with col3:
-            fig3 = px.pie(df, names="Industry", title="User Industry Distribution")
-            st.plotly_chart(fig3, use_container_width=True)
-    
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            fig4 = px.bar(
-                df.groupby("Industry").size().reset_index(name="Count"),
-                x="Industry",
-                y="Count",
-                title="User Count per Industry"
-            )
-            st.plotly_chart(fig4, use_container_width=True)
-    
-        with col2:
-            fig5 = px.box(df, x="Industry", y=df["Registered At"].dt.month, title="Registration Month by Industry")
-            st.plotly_chart(fig5, use_container_width=True)
-    
-        with col3:
-            fig6 = px.scatter(df, x="Registered At", y="Industry", color="Industry", title="Registration Timeline by Industry")
-            st.plotly_chart(fig6, use_container_width=True)
-    
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            fig7 = px.density_heatmap(df, x="Industry", y=df["Registered At"].dt.year, title="Industry Registrations by Year")
-            st.plotly_chart(fig7, use_container_width=True)
+        # Only the open tab's figures are built; the others run when selected.
+        industries_tab, timeline_tab, yearly_tab = st.tabs(
+            ["Industries", "Timeline", "Yearly"], key="user_statistics_tab", on_change="rerun"
+        )
+        if industries_tab.open:
+            with industries_tab:
+                col1, col2 = st.columns(2)
+                with col1:
+                    show_figure("user_count_by_industry", by_industry, lambda data: px.bar(
+                        data, x="Industry", y="Count", title="User Count by Industry"
+                    ))
+                with col2:
+                    show_figure("user_industry_distribution", by_industry, lambda data: px.pie(
+                        data, names="Industry", values="Count", title="User Industry Distribution"
+                    ))
+                col1, col2 = st.columns(2)
+                with col1:
+                    show_figure("user_registration_month", stats["month_quartiles"], month_boxes)
+                with col2:
+                    show_figure("user_count_per_industry", by_industry, lambda data: px.bar(
+                        data, x="Industry", y="Count", title="User Count per Industry"
+                    ))
     
-        with col2:
-            fig8 = px.histogram(df, x=df["Registered At"].dt.year, title="Registrations Per Year")
-            st.plotly_chart(fig8, use_container_width=True)
+        if timeline_tab.open:
+            with timeline_tab:
+                col1, col2 = st.columns(2)
+                with col1:
+                    over_time = reduce_series(totals, "Day", "Count", method="minmax")
+                    show_figure("user_registration_over_time", over_time, lambda data: px.line(
+                        data, x="Day", y="Count", title="User Registration Over Time"
+                    ))
+                with col2:
+                    timeline = bin_counts(daily, "Day", "Count", by="Industry")
+                    show_figure("user_registration_timeline", timeline, lambda data: px.scatter(
+                        data, x="Day", y="Industry", size="Count", color="Industry",
+                        title="Registration Timeline by Industry"
+                    ))
+                show_figure("user_cumulative_registrations", reduce_series(totals, "Day", "Share"), lambda data: px.line(
+                    data, x="Day", y="Share", line_shape="hv", title="Cumulative Registrations Over Time"
+                ))
     
-        with col3:
-            fig9 = px.ecdf(df, x="Registered At", title="Cumulative Registrations Over Time")
-            st.plotly_chart(fig9, use_container_width=True)
+        if yearly_tab.open:
+            with yearly_tab:
+                col1, col2 = st.columns(2)
+                with col1:
+                    show_figure("user_industry_by_year", by_year, lambda data: px.density_heatmap(
+                        data, x="Industry", y="Year", z="Count", histfunc="sum", title="Industry Registrations by Year"
+                    ))
+                with col2:
+                    per_year = by_year.groupby("Year", as_index=False)["Count"].sum()
+                    show_figure("user_registrations_per_year", per_year, lambda data: px.bar(
+                        data, x="Year", y="Count", title="Registrations Per Year"
+                    ))
     
     
     def show_hr_statistics():
         st.header("HR Statistics", divider="blue")
-        hr_data = auth_service.get_all_hr_accounts()
-        df = pd.DataFrame(hr_data, columns=["ID", "Name", "Username", "Email", "Registered At"])
-        df["Registered At"] = pd.to_datetime(df["Registered At"])
+        stats = auth_service.registration_statistics("HR", top_names=10)
+        if not stats["total"]:
+            st.info("No HR accounts have registered yet.")
+            return
+        daily = registrations_frame(stats).groupby(["Day", "Year", "Month"], as_index=False)["Count"].sum()
+        by_year = daily.groupby("Year", as_index=False)["Count"].sum()
+        totals = cumulative_frame(daily)
+        names = pd.DataFrame(stats["top_names"], columns=["Name", "Count"])
+        other = stats["total"] - names["Count"].sum()
+        if other:
+            names.loc[len(names)] = ["Other", other]
     
         st.write("### Overview Metrics")
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
-            st.metric("Total HRs", len(df))
+            st.metric("Total HRs", stats["total"])
         with col2:
-            st.metric("Most Recent HR", df.sort_values("Registered At", ascending=False)["Name"].iloc[0])
+            st.metric("Most Recent HR", stats["latest_name"])
         with col3:
-            st.metric("Earliest HR Registration", df["Registered At"].min().strftime("%Y-%m-%d"))
+            st.metric("Earliest HR Registration", stats["earliest"].strftime("%Y-%m-%d"))
         with col4:
-            st.metric("Average Registration Year", int(df["Registered At"].dt.year.mean()))
+            st.metric("Average Registration Year", int(stats["mean_year"]))
         with col5:
-            st.metric("Median Registration Year", int(df["Registered At"].dt.year.median()))
+            st.metric("Median Registration Year", int(stats["median_year"]))
     
         st.write("### Charts")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            fig1 = px.histogram(df, x="Registered At", title="HR Registration Over Time")
-            st.plotly_chart(fig1, use_container_width=True)
-    
-        with col2:
-            fig2 = px.pie(df, names="Name", title="HR Contribution Share")
-            st.plotly_chart(fig2, use_container_width=True)
-    
-        with col3:
-            fig3 = px.scatter(
-                df,
-                x="Registered At",
-                y=df["Registered At"].dt.year,
-                title="HR Registration by Year"
-            )
-            st.plotly_chart(fig3, use_container_width=True)
-    
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            fig4 = px.box(df, y="Registered At", title="HR Registration Date Spread")
-            st.plotly_chart(fig4, use_container_width=True)
-    
-        with col2:
-            fig5 = px.bar(
-                df.groupby(df["Registered At"].dt.year).size().reset_index(name="Count"),
-                x="Registered At",
-                y="Count",
-                title="HR Count per Year"
-            )
-            st.plotly_chart(fig5, use_container_width=True)
-    
-        with col3:
-            fig6 = px.line(df, x="Registered At", y=df.index, title="HR Registrations Timeline")
-            st.plotly_chart(fig6, use_container_width=True)
-    
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            fig7 = px.density_heatmap(df, x="Registered At", y=df.index, title="Registration Heatmap")
-            st.plotly_chart(fig7, use_container_width=True)
+        # Only the open tab's figures are built; the others run when selected.
+        timeline_tab, spread_tab, yearly_tab = st.tabs(
+            ["Timeline", "Spread", "Yearly"], key="hr_statistics_tab", on_change="rerun"
+        )
+        if timeline_tab.open:
+            with timeline_tab:
+                col1, col2 = st.columns(2)
+                with col1:
+                    show_figure("hr_registration_over_time", bin_counts(daily, "Day", "Count"), lambda data: px.bar(
+                        data, x="Day", y="Count", title="HR Registration Over Time"
+                    ))
+                with col2:
+                    show_figure("hr_registrations_timeline", reduce_series(totals, "Day", "Total"), lambda data: px.line(
+                        data, x="Day", y="Total", title="HR Registrations Timeline"
+                    ))
+                show_figure("hr_cumulative_registrations", reduce_series(totals, "Day", "Share"), lambda data: px.line(
+                    data, x="Day", y="Share", line_shape="hv", title="Cumulative Registrations Over Time"
+                ))
     
-        with col2:
-            fig8 = px.histogram(df, x=df["Registered At"].dt.year, title="Registrations Per Year")
-            st.plotly_chart(fig8, use_container_width=True)
+        if spread_tab.open:
+            with spread_tab:
+                col1, col2 = st.columns(2)
+                with col1:
+                    show_figure("hr_contribution_share", names, lambda data: px.pie(
+                        data, names="Name", values="Count", title="HR Contribution Share"
+                    ))
+                with col2:
+                    show_figure("hr_registration_spread", stats["date_quartiles"], date_box)
     
-        with col3:
-            fig9 = px.ecdf(df, x="Registered At", title="Cumulative Registrations Over Time")
-            st.plotly_chart(fig9, use_container_width=True)
+        if yearly_tab.open:
+            with yearly_tab:
+                col1, col2 = st.columns(2)
+                with col1:
+                    by_day = bin_counts(daily, "Day", "Count", by="Year")
+                    show_figure("hr_registration_by_year", by_day, lambda data: px.scatter(
+                        data, x="Day", y="Year", size="Count", title="HR Registration by Year"
+                    ))
+                with col2:
+                    show_figure("hr_count_per_year", by_year, lambda data: px.bar(
+                        data, x="Year", y="Count", title="HR Count per Year"
+                    ))
+                col1, col2 = st.columns(2)
+                with col1:
+                    show_figure("hr_registration_heatmap", daily, lambda data: px.density_heatmap(
+                        data, x="Month", y="Year", z="Count", histfunc="sum", title="Registration Heatmap"
+                    ))
+                with col2:
+                    show_figure("hr_registrations_per_year", by_year, lambda data: px.bar(
+                        data, x="Year", y="Count", title="Registrations Per Year"
+                    ))
     
     
     if selected == "Register HR":
@@ -350,13 +698,27 @@ def admin_view(auth_service):
                 st.write("")
                 register_hr()
 
+    elif selected == "Import Accounts":
+        _, col1, _ = st.columns([0.15, 0.70, 0.15])
+        with col1:
+            st.header("📤 Import Accounts", divider="blue")
+            import_accounts()
+
+    elif selected == "Export Accounts":
+        _, col1, _ = st.columns([0.25, 0.50, 0.25])
+        with col1:
+            st.header("📥 Export Accounts", divider="blue")
+            export_accounts()
+
+    elif selected == "Performance":
+        st.header("⏱️ Performance", divider="blue")
+        display_performance()
+
     elif selected == "Manage HR":
-        hr_accounts = auth_service.get_all_hr_accounts()
-        display_accounts(hr_accounts, role="HR")
+        display_accounts(role="HR")
 
     elif selected == "Manage Users":
-        user_accounts = auth_service.get_all_user_accounts()
-        display_accounts(user_accounts, role="User")
+        display_accounts(role="User")
 
     elif selected == "User Statistics":
         show_user_statistics()
@@ -365,5 +727,5 @@ def admin_view(auth_service):
         show_hr_statistics()
 
     elif selected == "Logout":
-        st.session_state.clear()
+        session_cookie.logout(auth_service)
         st.rerun()
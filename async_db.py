@@ -0,0 +1,229 @@
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import asynccontextmanager
+
+import psycopg2
+from psycopg2 import errors, extensions
+
+import metrics
+from db import PoolTimeout, PreparingConnection, get_statement
+
+
+async def _wait(conn):
+    """Drive an asynchronous psycopg2 connection until its pending operation completes."""
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            return
+        if state == extensions.POLL_READ:
+            add, remove = loop.add_reader, loop.remove_reader
+        elif state == extensions.POLL_WRITE:
+            add, remove = loop.add_writer, loop.remove_writer
+        else:
+            raise psycopg2.OperationalError(f"Unexpected poll state {state}.")
+        ready = loop.create_future()
+        fd = conn.fileno()
+        add(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            remove(fd)
+
+
+async def _execute(cur, sql, params=None):
+    """Run one statement on an asynchronous cursor, timed like metrics.TimedCursor when metrics are on."""
+    if not metrics.ENABLED:
+        cur.execute(sql, params)
+        await _wait(cur.connection)
+        return
+    statement = metrics.statement_label(sql)
+    started = time.perf_counter()
+    try:
+        cur.execute(sql, params)
+        # The statement is done once the connection polls OK, so this is its latency.
+        await _wait(cur.connection)
+    except Exception as e:
+        metrics.record_error(statement, e)
+        raise
+    metrics.record_query(statement, time.perf_counter() - started, cur.rowcount)
+
+
+class AsyncConnectionPool:
+    """Pool of asynchronous psycopg2 connections living on the shared database loop.
+
+    `target` labels the pool's connection acquire timings in metrics.
+    """
+
+    def __init__(self, connect_kwargs, maxconn=10, timeout=5.0, target="async-primary"):
+        self.connect_kwargs = connect_kwargs
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.target = target
+        self._idle = []
+        self._slots = asyncio.Semaphore(maxconn)
+        self._stats = {"checkouts": 0, "timeouts": 0, "created": 0, "discarded": 0}
+
+    async def _new_connection(self):
+        conn = psycopg2.connect(async_=True, connection_factory=PreparingConnection, **self.connect_kwargs)
+        # libpq does not enforce connect_timeout for asynchronous connections.
+        try:
+            await asyncio.wait_for(_wait(conn), self.connect_kwargs.get("connect_timeout"))
+        except asyncio.TimeoutError:
+            conn.close()
+            raise psycopg2.OperationalError("timeout expired while connecting")
+        self._stats["created"] += 1
+        return conn
+
+    @asynccontextmanager
+    async def connection(self):
+        """Check out a connection, waiting up to the pool timeout for a free slot."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise PoolTimeout(
+                f"No async database connection available within {self.timeout:.1f}s "
+                f"(pool size {self.maxconn})."
+            )
+        conn = None
+        broken = False
+        try:
+            while self._idle and conn is None:
+                conn = self._idle.pop()
+                if conn.closed:
+                    self._stats["discarded"] += 1
+                    conn = None
+            if conn is None:
+                try:
+                    conn = await self._new_connection()
+                except Exception as e:
+                    if metrics.ENABLED:
+                        metrics.record_error("connect", e)
+                    raise
+            self._stats["checkouts"] += 1
+            if metrics.ENABLED:
+                metrics.record_acquire(self.target, time.perf_counter() - started)
+            yield conn
+        except (psycopg2.InterfaceError, psycopg2.OperationalError):
+            broken = True
+            raise
+        finally:
+            if conn is not None:
+                if broken or conn.closed:
+                    conn.close()
+                    self._stats["discarded"] += 1
+                else:
+                    self._idle.append(conn)
+            self._slots.release()
+
+    def stats(self):
+        """Return a snapshot of pool usage."""
+        return dict(self._stats, idle=len(self._idle), maxconn=self.maxconn)
+
+
+_loop = None
+_loop_lock = threading.Lock()
+_async_pools = {}
+
+
+def _database_loop():
+    """Return the process-wide event loop that runs async queries, starting it on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="hirezy-async-db", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def run_concurrently(*awaitables, timeout=None):
+    """Run coroutines concurrently on the database loop and return their results in order.
+
+    Meant to be called from synchronous Streamlit code, so a page waits for its
+    slowest query rather than for the sum of all of them. The coroutines see the
+    caller's context variables, so their queries carry its metrics operation.
+    """
+    context = contextvars.copy_context()
+
+    async def gather():
+        # This task's context is its own copy, so the caller's values stay local to it.
+        for var, value in context.items():
+            var.set(value)
+        return await asyncio.gather(*awaitables)
+
+    return asyncio.run_coroutine_threadsafe(gather(), _database_loop()).result(timeout)
+
+
+class AsyncDatabase:
+    def __init__(self, db):
+        self.db = db
+
+    @property
+    def pool(self):
+        """Async pool for the primary; only usable on the database loop."""
+        return self._pool_for()
+
+    def _pool_for(self, replica_dsn=None):
+        key = self.db._server_key(replica_dsn)
+        pool = _async_pools.get(key)
+        if pool is None:
+            pool = AsyncConnectionPool(
+                self.db._connect_kwargs(replica_dsn),
+                maxconn=self.db.pool_max,
+                timeout=self.db.pool_timeout,
+                target="async-replica" if replica_dsn else "async-primary",
+            )
+            _async_pools[key] = pool
+        return pool
+
+    async def _run(self, name, params, fetch, readonly):
+        replica_dsn = self.db._pick_replica() if readonly else None
+        if replica_dsn is not None:
+            try:
+                return await self._run_on(self._pool_for(replica_dsn), name, params, fetch)
+            except (psycopg2.InterfaceError, psycopg2.OperationalError) as e:
+                # Reads are safe to retry on the primary. Connection failures carry no
+                # SQLSTATE; those also take the replica out of rotation for a while.
+                if e.pgcode is None:
+                    self.db._mark_replica_down(replica_dsn)
+            except PoolTimeout:
+                pass
+        return await self._run_on(self.pool, name, params, fetch)
+
+    async def _run_on(self, pool, name, params, fetch):
+        statement = get_statement(name)
+        async with pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                if name not in conn.prepared:
+                    await _execute(cur, statement.prepare_sql)
+                    conn.prepared.add(name)
+                await _execute(cur, statement.execute_sql, params)
+            except errors.DuplicatePreparedStatement:
+                # Prepared on the server already, only not tracked here. Async connections
+                # run in autocommit mode, so there is no transaction to recover.
+                conn.prepared.add(name)
+                await _execute(cur, statement.execute_sql, params)
+            except errors.InvalidSqlStatementName:
+                # Deallocated on the server (e.g. DISCARD ALL); prepare it again.
+                await _execute(cur, statement.prepare_sql)
+                conn.prepared.add(name)
+                await _execute(cur, statement.execute_sql, params)
+            return fetch(cur)
+
+    async def fetchone(self, name, params=(), readonly=True):
+        """Run a registered statement (on a replica unless readonly=False) and return its first row."""
+        return await self._run(name, params, lambda cur: cur.fetchone(), readonly)
+
+    async def fetchall(self, name, params=(), readonly=True):
+        """Run a registered statement (on a replica unless readonly=False) and return all of its rows."""
+        return await self._run(name, params, lambda cur: cur.fetchall(), readonly)
+
+    def pool_stats(self):
+        """Return usage statistics of the async pool."""
+        return self.pool.stats()
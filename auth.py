@@ -1,54 +1,383 @@
-import hashlib
+import asyncio
+import csv
+import io
+import secrets
+import string
+import threading
+import time
+import pandas as pd
 import psycopg2
 from psycopg2 import errors
-from db import Database
+from psycopg2.extras import execute_values
+import hashing
+from async_db import AsyncDatabase, run_concurrently
+from availability import availability_index
+from cache import TTLCache
+from db import Database, get_statement, register_statement
+from metrics import instrumented, tagged_steps
+from migrations import SEARCH_TEXT
+from sessions import SessionStore
+from throttle import default_throttle
+import validation
+from validation import INDUSTRIES
 
+LOGIN = register_statement("auth_login", '''
+    SELECT id, full_name, username, email, role_id, password
+    FROM users
+    WHERE lower(username) = lower(%s) OR lower(email) = lower(%s)
+''')
+USERNAME_EXISTS = register_statement(
+    "auth_username_exists", "SELECT username FROM users WHERE lower(username) = lower(%s)"
+)
+EMAIL_EXISTS = register_statement("auth_email_exists", "SELECT email FROM users WHERE lower(email) = lower(%s)")
+USER_ID_BY_USERNAME = register_statement("auth_user_id_by_username", "SELECT id FROM users WHERE username = %s")
+HR_DETAILS = register_statement("auth_hr_details", "SELECT full_name, email FROM users WHERE id = %s")
+ALL_HR_ACCOUNTS = register_statement("auth_all_hr_accounts", '''
+    SELECT id AS user_id, full_name, username, email, registered_at
+    FROM users
+    WHERE role_id = %s
+    ORDER BY registered_at DESC, id DESC
+''')
+ALL_USER_ACCOUNTS = register_statement("auth_all_user_accounts", '''
+    SELECT id AS user_id, full_name, username, email, industry, registered_at
+    FROM users
+    WHERE role_id = %s
+    ORDER BY registered_at DESC, id DESC
+''')
+HR_ACCOUNT_COLUMNS = ("user_id", "full_name", "username", "email", "registered_at")
+USER_ACCOUNT_COLUMNS = ("user_id", "full_name", "username", "email", "industry", "registered_at")
+# Keyset pages continue strictly after the (registered_at, id) of the previous page's last row.
+HR_ACCOUNTS_FIRST_PAGE = register_statement("auth_hr_accounts_first_page", '''
+    SELECT id AS user_id, full_name, username, email, registered_at
+    FROM users
+    WHERE role_id = %s
+    ORDER BY registered_at DESC, id DESC
+    LIMIT %s
+''')
+HR_ACCOUNTS_PAGE = register_statement("auth_hr_accounts_page", '''
+    SELECT id AS user_id, full_name, username, email, registered_at
+    FROM users
+    WHERE role_id = %s AND (registered_at, id) < (%s, %s)
+    ORDER BY registered_at DESC, id DESC
+    LIMIT %s
+''')
+USER_ACCOUNTS_FIRST_PAGE = register_statement("auth_user_accounts_first_page", '''
+    SELECT id AS user_id, full_name, username, email, industry, registered_at
+    FROM users
+    WHERE role_id = %s
+    ORDER BY registered_at DESC, id DESC
+    LIMIT %s
+''')
+USER_ACCOUNTS_PAGE = register_statement("auth_user_accounts_page", '''
+    SELECT id AS user_id, full_name, username, email, industry, registered_at
+    FROM users
+    WHERE role_id = %s AND (registered_at, id) < (%s, %s)
+    ORDER BY registered_at DESC, id DESC
+    LIMIT %s
+''')
+# Search ranks exact username/email matches first, then prefix matches on username,
+# name or email, then any other match, newest first within each rank. Each rank is
+# fetched by its own subquery, limited to the page size in the final order, so the
+# best matches are always found however many rows contain the term.
+SEARCH_MIN_LENGTH = 3
+_SEARCH_COLUMNS = "id, full_name, username, email, industry, registered_at"
+_SEARCH_SQL = f'''
+    SELECT {{columns}}
+    FROM (
+        (SELECT {_SEARCH_COLUMNS}
+         FROM users
+         WHERE role_id = %s AND (lower(username) = %s OR lower(email) = %s))
+        UNION
+        (SELECT {_SEARCH_COLUMNS}
+         FROM users
+         WHERE role_id = %s AND {SEARCH_TEXT} LIKE %s
+           AND (lower(username) LIKE %s OR lower(full_name) LIKE %s OR lower(email) LIKE %s)
+         ORDER BY registered_at DESC, id DESC
+         LIMIT %s)
+        UNION
+        (SELECT {_SEARCH_COLUMNS}
+         FROM users
+         WHERE role_id = %s AND {SEARCH_TEXT} LIKE %s
+         ORDER BY registered_at DESC, id DESC
+         LIMIT %s)
+    ) AS matches
+    ORDER BY
+        CASE
+            WHEN lower(username) = %s OR lower(email) = %s THEN 0
+            WHEN lower(username) LIKE %s OR lower(full_name) LIKE %s OR lower(email) LIKE %s THEN 1
+            ELSE 2
+        END,
+        registered_at DESC, id DESC
+    LIMIT %s
+'''
+SEARCH_INDEX_EXISTS = register_statement(
+    "auth_search_index_exists", "SELECT 1 FROM pg_indexes WHERE indexname = 'users_search_trgm_idx'"
+)
+SEARCH_HR_ACCOUNTS = register_statement(
+    "auth_search_hr_accounts",
+    _SEARCH_SQL.format(columns="id AS user_id, full_name, username, email, registered_at")
+)
+SEARCH_USER_ACCOUNTS = register_statement(
+    "auth_search_user_accounts",
+    _SEARCH_SQL.format(columns="id AS user_id, full_name, username, email, industry, registered_at")
+)
 
+# Dashboard aggregates read the trigger-maintained registration_rollup (one row per
+# role, industry and day), so their cost grows with days rather than accounts.
+# Percentiles are taken over the per-day buckets, weighted by registrations.
+STATS_SUMMARY = register_statement("auth_stats_summary", '''
+    WITH days AS (
+        SELECT day, industry, registrations
+        FROM registration_rollup
+        WHERE role_id = %s AND registrations > 0
+    ), years AS (
+        SELECT year, sum(registrations) OVER (ORDER BY year) AS running, sum(registrations) OVER () AS total
+        FROM (SELECT EXTRACT(YEAR FROM day)::integer AS year, sum(registrations) AS registrations
+              FROM days GROUP BY 1) AS per_year
+    )
+    SELECT sum(registrations),
+           count(DISTINCT NULLIF(industry, '')),
+           (SELECT industry FROM days WHERE industry <> '' GROUP BY industry
+            ORDER BY sum(registrations) DESC, industry LIMIT 1),
+           min(day),
+           max(day),
+           sum(EXTRACT(YEAR FROM day) * registrations) / NULLIF(sum(registrations), 0),
+           (SELECT min(year) FROM years WHERE running >= total / 2.0),
+           (SELECT full_name FROM users WHERE role_id = %s ORDER BY registered_at DESC, id DESC LIMIT 1)
+    FROM days
+''')
+STATS_DAILY = register_statement("auth_stats_daily", '''
+    SELECT day, NULLIF(industry, ''), registrations
+    FROM registration_rollup
+    WHERE role_id = %s AND registrations > 0
+    ORDER BY day, industry
+''')
+STATS_MONTH_QUARTILES = register_statement("auth_stats_month_quartiles", '''
+    WITH per_month AS (
+        SELECT industry, EXTRACT(MONTH FROM day)::integer AS month, sum(registrations) AS registrations
+        FROM registration_rollup
+        WHERE role_id = %s AND registrations > 0
+        GROUP BY 1, 2
+    ), months AS (
+        SELECT industry, month,
+               sum(registrations) OVER (PARTITION BY industry ORDER BY month) AS running,
+               sum(registrations) OVER (PARTITION BY industry) AS total
+        FROM per_month
+    )
+    SELECT NULLIF(industry, ''),
+           ARRAY[
+               min(month),
+               min(month) FILTER (WHERE running >= total * 0.25),
+               min(month) FILTER (WHERE running >= total * 0.5),
+               min(month) FILTER (WHERE running >= total * 0.75),
+               max(month)
+           ]
+    FROM months
+    GROUP BY industry
+    ORDER BY industry
+''')
+STATS_DATE_QUARTILES = register_statement("auth_stats_date_quartiles", '''
+    WITH days AS (
+        SELECT day,
+               sum(sum(registrations)) OVER (ORDER BY day) AS running,
+               sum(sum(registrations)) OVER () AS total
+        FROM registration_rollup
+        WHERE role_id = %s AND registrations > 0
+        GROUP BY day
+    )
+    SELECT ARRAY[
+        min(day),
+        min(day) FILTER (WHERE running >= total * 0.25),
+        min(day) FILTER (WHERE running >= total * 0.5),
+        min(day) FILTER (WHERE running >= total * 0.75),
+        max(day)
+    ]
+    FROM days
+''')
+# Cheap fingerprint of a role's registrations: newest account (index lookup) plus the
+# rollup's total and a checksum of its buckets, which moves when accounts change industry.
+STATS_VERSION = register_statement("auth_stats_version", '''
+    SELECT (SELECT max(registered_at) FROM users WHERE role_id = %s),
+           coalesce(sum(registrations), 0),
+           coalesce(sum(registrations * hashtext(industry || day::text)), 0)
+    FROM registration_rollup
+    WHERE role_id = %s
+''')
+STATS_TOP_NAMES = register_statement("auth_stats_top_names", '''
+    SELECT full_name, count(*)
+    FROM users
+    WHERE role_id = %s
+    GROUP BY full_name
+    ORDER BY count(*) DESC, full_name
+    LIMIT %s
+''')
+
+# Account listings shared by every Streamlit session of the process, keyed by server,
+# statement and role. Writes made through AuthService clear them; LISTING_CACHE_TTL
+# bounds how long writes made by other processes stay invisible.
+LISTING_CACHE_TTL = 300.0
+_listing_cache = TTLCache(max_entries=64, ttl=LISTING_CACHE_TTL)
+_listing_generations = {}
+_listing_lock = threading.Lock()
+
+
+@instrumented
 class AuthService:
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, session=None, read_your_writes_window=5.0, throttle=None):
         self.db = db
+        self.throttle = throttle or default_throttle()
+        self.sessions = SessionStore(db)
+        self.availability = availability_index(db)
+        # Per-session state (e.g. st.session_state) that remembers recent writes across reruns.
+        self.session = {} if session is None else session
+        self.read_your_writes_window = read_your_writes_window
+
+    def read_your_writes(self, seconds=None):
+        """Route this session's reads to the primary for the next `seconds`."""
+        seconds = self.read_your_writes_window if seconds is None else seconds
+        self.session["primary_reads_until"] = time.monotonic() + seconds
+
+    def _reads_from_replicas(self):
+        return self.session.get("primary_reads_until", 0) <= time.monotonic()
+
+    def _read_connection(self):
+        """Connection for read-only queries: a replica unless the session wrote recently."""
+        return self.db.connect(readonly=self._reads_from_replicas())
 
     @staticmethod
     def hash_password(password):
         """Hash the password for secure storage."""
-        return hashlib.sha256(password.encode()).hexdigest()
+        return hashing.hash_password(password)
 
     def register_user(self, full_name, username, email, password, industry, role_name="User"):
-        """Register a new user."""
+        """Register a new user and return their ID."""
+        role_id = self.db.role_id(role_name)
+        hashed_password = self.hash_password(password)
+
         with self.db.connect() as conn:
             with conn.cursor() as cur:
-                cur.execute('SELECT id FROM roles WHERE name = %s', (role_name,))
-                role = cur.fetchone()
-                if not role:
-                    raise ValueError(f"Role '{role_name}' not found. Ensure roles are initialized.")
-
-                hashed_password = self.hash_password(password)
-
                 try:
                     cur.execute(
                         '''
                         INSERT INTO users (full_name, username, email, password, industry, role_id)
                         VALUES (%s, %s, %s, %s, %s, %s)
+                        RETURNING id
                         ''',
-                        (full_name, username, email, hashed_password, industry, role[0])
+                        (full_name, username, email, hashed_password, industry, role_id)
                     )
+                    user_id = cur.fetchone()[0]
                     conn.commit()
+                    self.read_your_writes()
+                    self.invalidate_listings()
+                    self.availability.add(username, email)
+                    return user_id
                 except errors.UniqueViolation as e:
                     conn.rollback()
-                    if "users_username_key" in str(e):
+                    if e.diag.constraint_name in ("users_username_key", "users_lower_username_key"):
                         raise ValueError("The username is already taken. Please choose another.")
-                    if "users_email_key" in str(e):
+                    if e.diag.constraint_name in ("users_email_key", "users_lower_email_key"):
                         raise ValueError("The email is already registered. Please use a different email.")
                     raise e
 
+    def bulk_import(self, accounts, role_name="User", hasher_pool=None):
+        """Create many accounts at once and return a per-row report.
+
+        `accounts` is an iterable of mappings with full_name, username, email,
+        password and (for Users) industry. Invalid rows and rows clashing with
+        existing accounts are reported instead of aborting the batch. Passwords are
+        hashed in parallel batches and the rows are loaded with COPY into a staging
+        table, then merged into users with ON CONFLICT DO NOTHING.
+        """
+        role_id = self.db.role_id(role_name)
+        hasher_pool = hasher_pool or hashing.default_pool()
+        frame = pd.DataFrame(list(accounts), columns=["full_name", "username", "email", "password", "industry"])
+        frame = frame.astype(object).where(frame.notna(), None).set_axis(pd.RangeIndex(1, len(frame) + 1))
+        report = validation.validate_accounts(frame, role=role_name)
+        errors_by_row = report["reason"].dropna().to_dict()
+
+        valid = frame[report["valid"]]
+        rows = [
+            [
+                row_no,
+                str(full_name).strip(),
+                str(username).strip(),
+                str(email).strip(),
+                str(password),
+                (str(industry or "").strip() or None) if role_name == "User" else None,
+            ]
+            for row_no, full_name, username, email, password, industry in valid.itertuples(name=None)
+        ]
+
+        for row, hashed_password in zip(rows, hasher_pool.hash_many([row[4] for row in rows])):
+            row[4] = hashed_password
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+        buffer.seek(0)
+
+        inserted = []
+        with self.db.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    '''
+                    CREATE TEMP TABLE import_staging (
+                        row_no INTEGER, full_name TEXT, username TEXT, email TEXT, password TEXT, industry TEXT
+                    ) ON COMMIT DROP
+                    '''
+                )
+                cur.copy_expert("COPY import_staging FROM STDIN WITH (FORMAT csv)", buffer)
+                cur.execute(
+                    '''
+                    INSERT INTO users (full_name, username, email, password, industry, role_id)
+                    SELECT full_name, username, email, password, NULLIF(industry, ''), %s
+                    FROM import_staging
+                    ORDER BY row_no
+                    ON CONFLICT DO NOTHING
+                    RETURNING username, email
+                    ''',
+                    (role_id,)
+                )
+                inserted = cur.fetchall()
+                inserted_usernames = {username for username, _ in inserted}
+                rejected = [row[0] for row in rows if row[2] not in inserted_usernames]
+                if rejected:
+                    cur.execute(
+                        '''
+                        SELECT s.row_no,
+                               EXISTS (SELECT 1 FROM users u WHERE lower(u.username) = lower(s.username)),
+                               EXISTS (SELECT 1 FROM users u WHERE lower(u.email) = lower(s.email))
+                        FROM import_staging s
+                        WHERE s.row_no = ANY(%s)
+                        ''',
+                        (rejected,)
+                    )
+                    for row_no, username_taken, email_taken in cur.fetchall():
+                        if username_taken:
+                            errors_by_row[row_no] = "The username is already taken."
+                        elif email_taken:
+                            errors_by_row[row_no] = "The email is already registered."
+                        else:
+                            errors_by_row[row_no] = "Conflicts with an existing account."
+            conn.commit()
+
+        self.read_your_writes()
+        self.invalidate_listings()
+        for username, email in inserted:
+            self.availability.add(username, email)
+        return {
+            "inserted": len(inserted),
+            "failed": len(errors_by_row),
+            "errors": [{"row": row_no, "error": errors_by_row[row_no]} for row_no in sorted(errors_by_row)],
+        }
+
     def update_user(self, account_id, full_name, email, password=None, industry=None):
-        """Update user details by their ID."""
-        allowed_industries = ["Software", "Finance", "Healthcare", "Education"]
-    
+        """Update user details by their ID; a new password also ends all of the user's sessions."""
         if not self.is_valid_email(email):
             raise ValueError("Invalid email format.")
     
-        if industry and industry not in allowed_industries:
+        if industry and industry not in INDUSTRIES:
             raise ValueError("Invalid industry value.")
     
         with self.db.connect() as conn:
@@ -76,128 +405,429 @@ class AuthService:
     
                 if cur.rowcount == 0:
                     raise ValueError("User not found or no changes detected.")
+                if password:
+                    cur.execute("DELETE FROM sessions WHERE user_id = %s", (account_id,))
     
                 conn.commit()
+        self.read_your_writes()
+        self.invalidate_listings()
+        self.sessions.forget_user(account_id)
+        # The previous email stays in the index as a false positive until the next rebuild.
+        self.availability.add(email=email)
     
     def get_hr_details(self, hr_id):
         """Retrieve HR details by ID."""
-        with self.db.connect() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    '''
-                    SELECT full_name, email
-                    FROM users
-                    WHERE id = %s
-                    ''',
-                    (hr_id,)
-                )
-                row = cur.fetchone()
-                if row:
-                    return {"full_name": row[0], "email": row[1]}
-                else:
-                    raise ValueError("HR details not found.")
+        row = self.db.fetchone(HR_DETAILS, (hr_id,), readonly=self._reads_from_replicas())
+        if row:
+            return {"full_name": row[0], "email": row[1]}
+        else:
+            raise ValueError("HR details not found.")
 
     def get_user_id(self, username):
         """Retrieve the user ID based on the username."""
-        with self.db.connect() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-                result = cur.fetchone()
-                if result:
-                    return result[0]
-                else:
-                    raise ValueError(f"No user found with username: {username}")
+        result = self.db.fetchone(USER_ID_BY_USERNAME, (username,), readonly=self._reads_from_replicas())
+        if result:
+            return result[0]
+        else:
+            raise ValueError(f"No user found with username: {username}")
     
-    def authenticate_user(self, identifier, password):
-        """Authenticate a user using either username or email."""
+    def authenticate_user(self, identifier, password, client=None):
+        """Authenticate a user using either username or email.
+
+        Raises throttle.LoginThrottled, without touching the database, when the
+        identifier or client has exceeded its login attempts.
+        """
+        self.throttle.check(identifier, client)
+        candidates = self.db.fetchall(LOGIN, (identifier, identifier), readonly=self._reads_from_replicas())
+
+        verified = False
+        for user_id, full_name, username, email, role_id, stored_hash in candidates:
+            if not stored_hash:
+                continue
+            verified = True
+            matches, needs_rehash = hashing.verify_password(password, stored_hash)
+            if matches:
+                if needs_rehash:
+                    self._rehash_password(user_id, stored_hash, password)
+                self.throttle.success(identifier, client)
+                return (user_id, full_name, username, email, self.db.role_name(role_id))
+        if not verified:
+            # Spend the same KDF time as for a real account, so timing does not reveal existence.
+            hashing.verify_password(password, hashing.dummy_hash())
+        self.throttle.failure(identifier, client)
+        return None
+
+    def _rehash_password(self, user_id, stored_hash, password):
+        """Upgrade a legacy or outdated hash after a successful login."""
         with self.db.connect() as conn:
             with conn.cursor() as cur:
-                hashed_password = self.hash_password(password)
                 cur.execute(
-                    '''
-                    SELECT users.id, users.full_name, users.username, users.email, roles.name AS role
-                    FROM users
-                    INNER JOIN roles ON users.role_id = roles.id
-                    WHERE (users.username = %s OR users.email = %s) AND users.password = %s
-                    ''',
-                    (identifier, identifier, hashed_password)
+                    "UPDATE users SET password = %s WHERE id = %s AND password = %s",
+                    (self.hash_password(password), user_id, stored_hash)
                 )
-                return cur.fetchone()
+                conn.commit()
     
     def check_username_exists(self, username):
         """Check if a username already exists in the database."""
-        with self.db.connect() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT username FROM users WHERE username = %s", (username,))
-                return cur.fetchone() is not None
+        if not self.availability.might_have_username(username):
+            return False
+        return self.db.fetchone(USERNAME_EXISTS, (username,), readonly=self._reads_from_replicas()) is not None
 
     def check_email_exists(self, email):
         """Check if an email already exists in the database."""
-        with self.db.connect() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT email FROM users WHERE email = %s", (email,))
-                return cur.fetchone() is not None
+        if not self.availability.might_have_email(email):
+            return False
+        return self.db.fetchone(EMAIL_EXISTS, (email,), readonly=self._reads_from_replicas()) is not None
+
+    def _cached_listing(self, statement, params):
+        server = self.db._server_key()
+        key = (server, statement, params)
+        rows = _listing_cache.get(key)
+        if rows is not None:
+            return list(rows)
+
+        generation, invalidated_at = _listing_generations.get(server, (0, float("-inf")))
+        readonly = self._reads_from_replicas()
+        rows = tuple(self.db.fetchall(statement, params, readonly=readonly))
+
+        # A replica may not have replayed the latest write yet, so its results are only
+        # cached once the read-your-writes window after the last invalidation has passed.
+        lagging = readonly and self.db.replica_dsns and time.monotonic() - invalidated_at < self.read_your_writes_window
+        with _listing_lock:
+            if not lagging and _listing_generations.get(server, (0,))[0] == generation:
+                _listing_cache.set(key, rows)
+        return list(rows)
+
+    def search_is_indexed(self):
+        """Whether the trigram index behind search_accounts exists; without it every search scans users."""
+        key = (self.db._server_key(), "search_is_indexed")
+        indexed = _listing_cache.get(key)
+        if indexed is None:
+            indexed = self.db.fetchone(SEARCH_INDEX_EXISTS, readonly=False) is not None
+            _listing_cache.set(key, indexed)
+        return indexed
+
+    def invalidate_listings(self):
+        """Drop cached account listings after a committed write."""
+        server = self.db._server_key()
+        with _listing_lock:
+            generation, _ = _listing_generations.get(server, (0, 0.0))
+            _listing_generations[server] = (generation + 1, time.monotonic())
+            _listing_cache.discard_if(lambda key, _: key[0] == server)
+
+    @staticmethod
+    def listing_cache_stats():
+        """Return hit/miss counters of the account listing cache."""
+        return _listing_cache.stats()
 
     def get_all_hr_accounts(self):
         """Retrieve all HR accounts ordered by registration date (newest first)."""
+        return self._cached_listing(ALL_HR_ACCOUNTS, (self.db.role_id("HR"),))
+
+    def get_all_user_accounts(self):
+        """Retrieve all User accounts including industry and registration date, ordered by registration date (newest first)."""
+        return self._cached_listing(ALL_USER_ACCOUNTS, (self.db.role_id("User"),))
+
+    def search_accounts(self, role_name, query, limit=50):
+        """Find accounts of a role whose name, username, email or industry contains `query`.
+
+        Exact and prefix matches on username, name or email rank first, then newer
+        accounts. Queries shorter than SEARCH_MIN_LENGTH return no rows, since the
+        trigram index cannot narrow them down.
+        """
+        query = (query or "").strip().lower()
+        if len(query) < SEARCH_MIN_LENGTH:
+            return []
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        statement = SEARCH_USER_ACCOUNTS if role_name == "User" else SEARCH_HR_ACCOUNTS
+        role_id = self.db.role_id(role_name)
+        contains, prefix = f"%{escaped}%", f"{escaped}%"
+        params = (
+            role_id, query, query,
+            role_id, contains, prefix, prefix, prefix, limit,
+            role_id, contains, limit,
+            query, query, prefix, prefix, prefix, limit,
+        )
+        return self._cached_listing(statement, params)
+
+    def _account_page(self, first_page, next_page, role_name, after, limit):
+        role_id = self.db.role_id(role_name)
+        readonly = self._reads_from_replicas()
+        # One extra row tells whether another page follows.
+        if after is None:
+            rows = self.db.fetchall(first_page, (role_id, limit + 1), readonly=readonly)
+        else:
+            rows = self.db.fetchall(next_page, (role_id, after[0], after[1], limit + 1), readonly=readonly)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1][-1], rows[-1][0])
+
+    def statistics_version(self, role_name):
+        """Return a token that changes whenever the role's registration statistics may have changed.
+
+        Writes made through this process also bump it immediately; other
+        processes' changes to names only show after LISTING_CACHE_TTL.
+        """
+        role_id = self.db.role_id(role_name)
+        version = self.db.fetchone(STATS_VERSION, (role_id, role_id), readonly=self._reads_from_replicas())
+        return version + (_listing_generations.get(self.db._server_key(), (0,))[0],)
+
+    def registration_statistics(self, role_name, top_names=10):
+        """Aggregate registration statistics of a role, computed in Postgres.
+
+        The queries run concurrently on the async pool; see
+        AsyncAuthService.registration_statistics for the returned keys. Results
+        are cached under statistics_version(), so unchanged data costs one query.
+        """
+        key = (self.db._server_key(), "registration_statistics", role_name, top_names, self.statistics_version(role_name))
+        stats = _listing_cache.get(key)
+        if stats is None:
+            service = AsyncAuthService(AsyncDatabase(self.db), session=self.session)
+            stats = run_concurrently(service.registration_statistics(role_name, top_names))[0]
+            stats["version"] = key[-1]
+            _listing_cache.set(key, stats)
+        return stats
+
+    def _iter_accounts(self, statement, role_name, itersize):
+        role_id = self.db.role_id(role_name)
+        with self._read_connection() as conn:
+            # A named cursor keeps the result on the server and fetches it `itersize` rows at a time.
+            with conn.cursor(name=f"iter_{statement}") as cur:
+                cur.itersize = itersize
+                cur.execute(get_statement(statement).sql, (role_id,))
+                yield from cur
+
+    def iter_hr_accounts(self, itersize=10_000):
+        """Yield every HR account (HR_ACCOUNT_COLUMNS), newest first, without loading them all at once.
+
+        The connection stays checked out until the generator is exhausted or closed.
+        """
+        return tagged_steps(self._iter_accounts(ALL_HR_ACCOUNTS, "HR", itersize), "AuthService.iter_hr_accounts")
+
+    def iter_user_accounts(self, itersize=10_000):
+        """Yield every User account (USER_ACCOUNT_COLUMNS), newest first, without loading them all at once."""
+        return tagged_steps(self._iter_accounts(ALL_USER_ACCOUNTS, "User", itersize), "AuthService.iter_user_accounts")
+
+    def get_hr_accounts_page(self, after=None, limit=50):
+        """Return one page of HR accounts, newest first, and the cursor of the next page.
+
+        `after` is the cursor returned with the previous page (None for the first
+        page); the returned cursor is None on the last page.
+        """
+        return self._account_page(HR_ACCOUNTS_FIRST_PAGE, HR_ACCOUNTS_PAGE, "HR", after, limit)
+
+    def get_user_accounts_page(self, after=None, limit=50):
+        """Return one page of User accounts, newest first, and the cursor of the next page."""
+        return self._account_page(USER_ACCOUNTS_FIRST_PAGE, USER_ACCOUNTS_PAGE, "User", after, limit)
+
+    def delete_user(self, user_id):
+        """Delete a user by their ID."""
+        with self.db.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM users WHERE id = %s RETURNING username, email", (user_id,))
+                deleted = cur.fetchone()
+                conn.commit()
+        self.read_your_writes()
+        self.invalidate_listings()
+        self.sessions.forget_user(user_id)
+        if deleted:
+            self.availability.remove(*deleted)
+
+    def delete_users(self, user_ids):
+        """Delete many users in one statement and return how many were removed."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
         with self.db.connect() as conn:
             with conn.cursor() as cur:
                 cur.execute(
-                    '''
-                    SELECT users.id AS user_id, users.full_name, users.username, users.email, users.registered_at
-                    FROM users
-                    INNER JOIN roles ON users.role_id = roles.id
-                    WHERE roles.name = 'HR'
-                    ORDER BY users.registered_at DESC
-                    '''
+                    "DELETE FROM users WHERE id = ANY(%s) RETURNING id, username, email", (user_ids,)
                 )
-                return cur.fetchall()
+                deleted = cur.fetchall()
+                conn.commit()
+        self.read_your_writes()
+        self.invalidate_listings()
+        self.sessions.forget_users(user_ids)
+        for _, username, email in deleted:
+            self.availability.remove(username, email)
+        return len(deleted)
 
-    def get_all_user_accounts(self):
-        """Retrieve all User accounts including industry and registration date, ordered by registration date (newest first)."""
+    def update_industries(self, assignments):
+        """Set the industry of many users in one statement.
+
+        `assignments` maps user IDs to industries; returns how many rows changed.
+        """
+        assignments = list(dict(assignments).items())
+        if not assignments:
+            return 0
+        if any(industry not in INDUSTRIES for _, industry in assignments):
+            raise ValueError("Invalid industry value.")
         with self.db.connect() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    '''
-                    SELECT users.id AS user_id, users.full_name, users.username, users.email, users.industry, users.registered_at
-                    FROM users
-                    INNER JOIN roles ON users.role_id = roles.id
-                    WHERE roles.name = 'User'
-                    ORDER BY users.registered_at DESC
+                execute_values(
+                    cur,
                     '''
+                    UPDATE users SET industry = v.industry
+                    FROM (VALUES %s) AS v (id, industry)
+                    WHERE users.id = v.id
+                    ''',
+                    assignments,
+                    template="(%s::integer, %s::text)",
+                    page_size=len(assignments),
                 )
-                return cur.fetchall()
+                updated = cur.rowcount
+                conn.commit()
+        self.read_your_writes()
+        self.invalidate_listings()
+        self.sessions.forget_users([user_id for user_id, _ in assignments])
+        return updated
 
-    def delete_user(self, user_id):
-        """Delete a user by their ID."""
+    @staticmethod
+    def _temporary_password(length=12):
+        alphabet = string.ascii_letters + string.digits
+        required = [
+            secrets.choice(string.ascii_letters),
+            secrets.choice(string.digits),
+            secrets.choice("@$!%*?&#"),
+        ]
+        characters = required + [secrets.choice(alphabet) for _ in range(length - len(required))]
+        # Otherwise the letter, digit and symbol would always be the first three characters.
+        secrets.SystemRandom().shuffle(characters)
+        return "".join(characters)
+
+    def reset_passwords(self, user_ids):
+        """Give many users new random passwords and end their sessions.
+
+        Returns a list of (user ID, username, temporary password) for the
+        accounts that were reset.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+        passwords = [self._temporary_password() for _ in user_ids]
+        hashed = hashing.default_pool().hash_many(passwords)
         with self.db.connect() as conn:
             with conn.cursor() as cur:
-                cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
+                updated = execute_values(
+                    cur,
+                    '''
+                    UPDATE users SET password = v.password
+                    FROM (VALUES %s) AS v (id, password)
+                    WHERE users.id = v.id
+                    RETURNING users.id, users.username
+                    ''',
+                    list(zip(user_ids, hashed)),
+                    template="(%s::integer, %s::text)",
+                    page_size=len(user_ids),
+                    fetch=True,
+                )
+                cur.execute("DELETE FROM sessions WHERE user_id = ANY(%s)", (user_ids,))
                 conn.commit()
+        self.sessions.forget_users(user_ids)
+        password_by_id = dict(zip(user_ids, passwords))
+        return [(user_id, username, password_by_id[user_id]) for user_id, username in updated]
+
+    def create_session(self, user):
+        """Start a persistent session for a logged-in user dict and return its signed token."""
+        return self.sessions.create(user)
+
+    def resolve_session(self, token):
+        """Return the user dict for a session token, or None if it is invalid, expired or revoked."""
+        return self.sessions.resolve(token)
+
+    def revoke_session(self, token):
+        """Log a session token out everywhere."""
+        self.sessions.revoke(token)
+
+    def purge_expired_sessions(self):
+        """Delete expired sessions in bulk and return how many were removed."""
+        return self.sessions.purge_expired()
   
     @staticmethod
     def is_valid_email(email):
         """Validate email format."""
-        import re
-        email_regex = (
-            r"^(?!\.)"
-            r"[a-zA-Z0-9_.+-]+"
-            r"(?<!\.)@"
-            r"[a-zA-Z0-9-]+"
-            r"(\.[a-zA-Z]{2,})+$"
-        )
-        return bool(re.match(email_regex, email)) and ".." not in email
+        return validation.is_valid_email(email)
 
     @staticmethod
     def is_valid_password(password):
         """Validate password strength."""
-        import re
-        if len(password) < 8:
-            return False
-        if not re.search(r"[a-zA-Z]", password):
-            return False
-        if not re.search(r"[0-9]", password):
-            return False
-        if not re.search(r"[@$!%*?&#]", password):
-            return False
-        return True
\ No newline at end of file
+        return validation.is_valid_password(password)
+
+
+class AsyncAuthService:
+    """Asynchronous counterpart of the read-only AuthService methods."""
+
+    def __init__(self, async_db, session=None):
+        self.async_db = async_db
+        self.db = async_db.db
+        self.session = {} if session is None else session
+
+    def _readonly(self):
+        return self.session.get("primary_reads_until", 0) <= time.monotonic()
+
+    async def get_hr_details(self, hr_id):
+        """Retrieve HR details by ID."""
+        row = await self.async_db.fetchone(HR_DETAILS, (hr_id,), readonly=self._readonly())
+        if row:
+            return {"full_name": row[0], "email": row[1]}
+        raise ValueError("HR details not found.")
+
+    async def get_user_id(self, username):
+        """Retrieve the user ID based on the username."""
+        row = await self.async_db.fetchone(USER_ID_BY_USERNAME, (username,), readonly=self._readonly())
+        if row:
+            return row[0]
+        raise ValueError(f"No user found with username: {username}")
+
+    async def check_username_exists(self, username):
+        """Check if a username already exists in the database."""
+        return await self.async_db.fetchone(USERNAME_EXISTS, (username,), readonly=self._readonly()) is not None
+
+    async def check_email_exists(self, email):
+        """Check if an email already exists in the database."""
+        return await self.async_db.fetchone(EMAIL_EXISTS, (email,), readonly=self._readonly()) is not None
+
+    async def get_all_hr_accounts(self):
+        """Retrieve all HR accounts ordered by registration date (newest first)."""
+        return await self.async_db.fetchall(ALL_HR_ACCOUNTS, (self.db.role_id("HR"),), readonly=self._readonly())
+
+    async def get_all_user_accounts(self):
+        """Retrieve all User accounts ordered by registration date (newest first)."""
+        return await self.async_db.fetchall(ALL_USER_ACCOUNTS, (self.db.role_id("User"),), readonly=self._readonly())
+
+    async def registration_statistics(self, role_name, top_names=10):
+        """Aggregate registration statistics of a role with one concurrent query per aggregate.
+
+        Returns a dict with the summary values (total, industries, top_industry,
+        earliest and latest registration day, mean_year, median_year, latest_name) and the row lists
+        daily (day, industry, count), month_quartiles (industry, [min, q1, median,
+        q3, max]), date_quartiles ([min, q1, median, q3, max]) and top_names
+        (full_name, count) of the `top_names` most common names (skipped when 0).
+        """
+        role_id = self.db.role_id(role_name)
+        readonly = self._readonly()
+        queries = [
+            self.async_db.fetchone(STATS_SUMMARY, (role_id, role_id), readonly=readonly),
+            self.async_db.fetchall(STATS_DAILY, (role_id,), readonly=readonly),
+            self.async_db.fetchall(STATS_MONTH_QUARTILES, (role_id,), readonly=readonly),
+            self.async_db.fetchone(STATS_DATE_QUARTILES, (role_id,), readonly=readonly),
+        ]
+        if top_names:
+            queries.append(self.async_db.fetchall(STATS_TOP_NAMES, (role_id, top_names), readonly=readonly))
+        summary, daily, month_quartiles, date_quartiles, *names = await asyncio.gather(*queries)
+        total, industries, top_industry, earliest, latest, mean_year, median_year, latest_name = summary
+        return {
+            "total": int(total or 0),
+            "industries": industries,
+            "top_industry": top_industry,
+            "earliest": earliest,
+            "latest": latest,
+            "mean_year": float(mean_year) if mean_year is not None else None,
+            "median_year": float(median_year) if median_year is not None else None,
+            "latest_name": latest_name,
+            "daily": daily,
+            "month_quartiles": month_quartiles,
+            "date_quartiles": date_quartiles[0],
+            "top_names": names[0] if names else [],
+        }
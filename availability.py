@@ -0,0 +1,163 @@
+import hashlib
+import math
+import threading
+import time
+
+
+class CountingBloomFilter:
+    """Bloom filter with 8-bit counters so items can be removed as well as added."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._counters = bytearray(self.size)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            if self._counters[position] < 255:
+                self._counters[position] += 1
+        self.count += 1
+
+    def remove(self, item):
+        positions = self._positions(item)
+        if not all(self._counters[position] for position in positions):
+            return
+        for position in positions:
+            # Saturated counters no longer know their true count, so they stay put.
+            if self._counters[position] < 255:
+                self._counters[position] -= 1
+        self.count -= 1
+
+    def __contains__(self, item):
+        return all(self._counters[position] for position in self._positions(item))
+
+
+def normalize(value):
+    """Usernames and emails are compared case-insensitively, as in the lower() indexes."""
+    return (value or "").strip().lower()
+
+
+class AvailabilityIndex:
+    """In-memory filters of taken usernames and emails for the per-keystroke registration checks.
+
+    A miss means the value is definitely free, so no query is needed; a hit may be a
+    false positive and must be confirmed in SQL. The filters are built in a background
+    thread and rebuilt every `rebuild_after` seconds to pick up writes made by other
+    processes. The UNIQUE constraints remain the final arbiter on insert.
+    """
+
+    def __init__(self, db, rebuild_after=600.0, error_rate=0.01, itersize=10_000):
+        self.db = db
+        self.rebuild_after = rebuild_after
+        self.error_rate = error_rate
+        self.itersize = itersize
+        self._filters = None
+        self._built_at = 0.0
+        self._building = False
+        self._pending = []
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._filters is not None
+
+    def _start_build(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+            self._pending = []
+        threading.Thread(target=self._build, name="hirezy-availability-index", daemon=True).start()
+
+    def _build(self):
+        try:
+            with self.db.connect(readonly=True) as conn:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT count(*) FROM users')
+                    capacity = max(cur.fetchone()[0] * 2, 1024)
+                usernames = CountingBloomFilter(capacity, self.error_rate)
+                emails = CountingBloomFilter(capacity, self.error_rate)
+                with conn.cursor(name="availability_index_scan") as cur:
+                    cur.itersize = self.itersize
+                    cur.execute('SELECT lower(username), lower(email) FROM users')
+                    for username, email in cur:
+                        if username:
+                            usernames.add(username)
+                        if email:
+                            emails.add(email)
+            with self._lock:
+                # Replay writes that happened while the snapshot was being read.
+                for apply in self._pending:
+                    apply(usernames, emails)
+                self._filters = (usernames, emails)
+                self._built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._building = False
+                self._pending = []
+
+    def _filters_or_none(self):
+        filters = self._filters
+        stale = filters is None or time.monotonic() - self._built_at > self.rebuild_after
+        if stale and not self._building:
+            self._start_build()
+        if filters is not None and filters[0].count > filters[0].capacity:
+            self._start_build()
+        return filters
+
+    def _update(self, apply):
+        with self._lock:
+            if self._filters is not None:
+                apply(*self._filters)
+            if self._building:
+                self._pending.append(apply)
+
+    def might_have_username(self, username):
+        """False only when the username is definitely not taken."""
+        filters = self._filters_or_none()
+        return filters is None or normalize(username) in filters[0]
+
+    def might_have_email(self, email):
+        """False only when the email is definitely not registered."""
+        filters = self._filters_or_none()
+        return filters is None or normalize(email) in filters[1]
+
+    def add(self, username=None, email=None):
+        """Record a username and/or email as taken."""
+        def apply(usernames, emails):
+            if username:
+                usernames.add(normalize(username))
+            if email:
+                emails.add(normalize(email))
+        self._update(apply)
+
+    def remove(self, username=None, email=None):
+        """Record a username and/or email as freed."""
+        def apply(usernames, emails):
+            if username:
+                usernames.remove(normalize(username))
+            if email:
+                emails.remove(normalize(email))
+        self._update(apply)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def availability_index(db):
+    """Process-wide availability index for the database's primary server."""
+    key = db._server_key()
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(key, AvailabilityIndex(db))
+    return index
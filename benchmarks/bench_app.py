@@ -0,0 +1,306 @@
+"""Timed AuthService and dashboard scenarios against a seeded database.
+
+Seed the database first (see benchmarks.seed_accounts), then run from the
+repository root:
+
+    python -m benchmarks.bench_app [--seconds 5] [--concurrency 1] [--scenarios login search ...]
+                                   [--output benchmarks/results/run.json]
+                                   [--compare benchmarks/results/baseline.json]
+
+The database comes from --dsn or HIREZY_DATABASE_URL. Results, with the git
+commit and dataset size, are written as JSON (by default to benchmarks/results/,
+which git ignores) so runs on different commits can be compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from async_db import AsyncDatabase, run_concurrently
+from auth import AsyncAuthService, AuthService
+from benchmarks.seed_accounts import BENCH_PASSWORD, LAST_NAMES, USERNAME_PREFIX
+from db import Database
+from downsample import bin_counts, reduce_series
+from throttle import LoginThrottle
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def measure(operation, seconds, concurrency=1, min_iterations=3):
+    """Call operation(i) from `concurrency` threads for `seconds` and summarize the latencies."""
+    deadline = time.perf_counter() + seconds
+    counter = iter(range(10 ** 12))
+    counter_lock = threading.Lock()
+    latencies = [[] for _ in range(concurrency)]
+    failures = []
+
+    def worker(slot):
+        while not failures:
+            with counter_lock:
+                i = next(counter)
+            if i >= min_iterations and time.perf_counter() >= deadline:
+                return
+            started = time.perf_counter()
+            try:
+                operation(i)
+            except Exception as e:
+                failures.append(e)
+                return
+            latencies[slot].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if failures:
+        raise failures[0]
+
+    samples = np.array([latency for slot in latencies for latency in slot]) * 1000
+    return {
+        "iterations": len(samples),
+        "seconds": round(elapsed, 3),
+        "ops_per_second": round(len(samples) / elapsed, 2),
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "max_ms": round(float(samples.max()), 3),
+    }
+
+
+def seeded_accounts(db):
+    """Number of seeded accounts per role; seeded usernames are numbered 0 .. total - 1."""
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT r.name, count(*)
+                FROM users u JOIN roles r ON r.id = u.role_id
+                WHERE u.username ~ %s
+                GROUP BY r.name
+            ''', (f"^{USERNAME_PREFIX}[0-9]+$",))
+            return dict(cur.fetchall())
+
+
+def seeded_username(rng, total):
+    return f"{USERNAME_PREFIX}{rng.randrange(total):08d}"
+
+
+def login(service, db, total, rng):
+    # A private throttle: every benchmark login comes from one process and would soon be limited.
+    service.throttle = LoginThrottle()
+
+    def operation(i):
+        if service.authenticate_user(seeded_username(rng, total), BENCH_PASSWORD) is None:
+            raise RuntimeError("Seeded account failed to log in; was it seeded with another password?")
+    return operation
+
+
+def registration(service, db, total, rng):
+    token = f"reg{int(time.time())}"
+
+    def operation(i):
+        username = f"{USERNAME_PREFIX}{token}_{i}"
+        service.register_user("Bench Registrant", username, f"{username}@example.com", BENCH_PASSWORD, "Software")
+    return operation
+
+
+def cleanup_registrations(db):
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM users WHERE username LIKE %s", (USERNAME_PREFIX.replace("_", "\\_") + "reg%",))
+            conn.commit()
+
+
+def existence_checks(service, db, total, rng):
+    # Time the steady state: the availability index answers most misses once it is built.
+    service.check_username_exists("warm-up")
+    deadline = time.monotonic() + 300
+    while not service.availability.ready and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+    def operation(i):
+        name = seeded_username(rng, total) if i % 2 else f"nobody_{rng.randrange(10 ** 9)}"
+        if i % 4 < 2:
+            service.check_username_exists(name)
+        else:
+            service.check_email_exists(f"{name}@gmail.com")
+    return operation
+
+
+def list_hr_cold(service, db, total, rng):
+    def operation(i):
+        service.invalidate_listings()
+        service.get_all_hr_accounts()
+    return operation
+
+
+def list_hr_cached(service, db, total, rng):
+    service.get_all_hr_accounts()
+    return lambda i: service.get_all_hr_accounts()
+
+
+def list_user_pages(service, db, total, rng, pages=20):
+    cursor = [None]
+
+    def operation(i):
+        # Walk `pages` pages deep, then start again from the newest accounts.
+        _, cursor[0] = service.get_user_accounts_page(after=None if i % pages == 0 else cursor[0])
+    return operation
+
+
+def search(service, db, total, rng):
+    def operation(i):
+        # Surnames match many accounts, digit runs a few; results are never served from the cache.
+        query = rng.choice(LAST_NAMES).lower()[:rng.randint(3, 6)] if i % 2 else f"{rng.randrange(10 ** 5):05d}"
+        service.invalidate_listings()
+        service.search_accounts("HR" if i % 5 == 0 else "User", query, limit=200)
+    return operation
+
+
+def stats_query(service, db, total, rng):
+    async_service = AsyncAuthService(AsyncDatabase(db))
+    return lambda i: run_concurrently(async_service.registration_statistics("User", 10))[0]
+
+
+def stats_cached(service, db, total, rng):
+    service.registration_statistics("User", top_names=0)
+    return lambda i: service.registration_statistics("User", top_names=0)
+
+
+def stats_figures(service, db, total, rng):
+    """DataFrames and figure JSON of the User Statistics dashboard, without the figure cache."""
+    stats = service.registration_statistics("User", top_names=0)
+
+    def operation(i):
+        daily = pd.DataFrame(stats["daily"], columns=["Day", "Industry", "Count"])
+        daily["Day"] = pd.to_datetime(daily["Day"])
+        daily["Year"] = daily["Day"].dt.year
+        by_industry = daily.groupby("Industry", as_index=False)["Count"].sum()
+        by_year = daily.groupby(["Year", "Industry"], as_index=False)["Count"].sum()
+        totals = daily.groupby("Day", as_index=False)["Count"].sum()
+        totals["Count"] = totals["Count"].cumsum()
+        figures = [
+            px.bar(by_industry, x="Industry", y="Count"),
+            px.pie(by_industry, names="Industry", values="Count"),
+            px.line(reduce_series(totals, "Day", "Count", method="minmax"), x="Day", y="Count"),
+            px.scatter(bin_counts(daily, "Day", "Count", by="Industry"), x="Day", y="Count", color="Industry"),
+            px.bar(by_year, x="Year", y="Count", color="Industry"),
+        ]
+        for figure in figures:
+            figure.to_json()
+    return operation
+
+
+SCENARIOS = {
+    "login": login,
+    "registration": registration,
+    "existence_checks": existence_checks,
+    "list_hr_cold": list_hr_cold,
+    "list_hr_cached": list_hr_cached,
+    "list_user_pages": list_user_pages,
+    "search": search,
+    "stats_query": stats_query,
+    "stats_cached": stats_cached,
+    "stats_figures": stats_figures,
+}
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+def server_version(db):
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            return cur.fetchone()[0]
+
+
+def print_comparison(results, baseline):
+    print(f"\n{'scenario':<18} {'baseline/s':>12} {'current/s':>12} {'change':>8}")
+    for name, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        change = result["ops_per_second"] / before["ops_per_second"] - 1
+        print(f"{name:<18} {before['ops_per_second']:>12,.1f} {result['ops_per_second']:>12,.1f} {change:>+8.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="threads calling each scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=42, help="seed for choosing accounts and queries")
+    parser.add_argument("--dsn", default=os.environ.get("HIREZY_DATABASE_URL"), help="database URL")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "bench_app.json"), help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    db = Database(dsn=args.dsn, pooled=True, pool_max=max(10, args.concurrency + 2))
+    db.initialize()
+    seeded = seeded_accounts(db)
+    total = sum(seeded.values())
+    if not total:
+        parser.error("no seeded accounts found; run `python -m benchmarks.seed_accounts` first")
+
+    commit, dirty = git_commit()
+    results = {
+        "benchmark": "bench_app",
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "git_dirty": dirty,
+        "python": platform.python_version(),
+        "postgres": server_version(db),
+        "cpu_count": os.cpu_count(),
+        "dataset": {"seeded_users": seeded.get("User", 0), "seeded_hr": seeded.get("HR", 0)},
+        "settings": {"seconds": args.seconds, "concurrency": args.concurrency, "seed": args.seed},
+        "scenarios": {},
+    }
+
+    print(f"{total:,} seeded accounts, commit {(commit or 'unknown')[:10]}{' (dirty)' if dirty else ''}")
+    print(f"{'scenario':<18} {'iterations':>10} {'ops/s':>10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    try:
+        for name in args.scenarios:
+            service = AuthService(db)
+            operation = SCENARIOS[name](service, db, total, random.Random(f"{args.seed}-{name}"))
+            result = measure(operation, args.seconds, args.concurrency)
+            results["scenarios"][name] = result
+            print(
+                f"{name:<18} {result['iterations']:>10} {result['ops_per_second']:>10,.1f} {result['mean_ms']:>9.2f} "
+                f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+            )
+    finally:
+        cleanup_registrations(db)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            print_comparison(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Password hashing throughput at several cost settings.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_hashing [--seconds 3] [--workers N]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hashing import PasswordHasherPool, PBKDF2Hasher, ScryptHasher
+
+
+COST_SETTINGS = [
+    ScryptHasher(n=2 ** 12),
+    ScryptHasher(n=2 ** 14),
+    ScryptHasher(n=2 ** 15),
+    PBKDF2Hasher(iterations=100_000),
+    PBKDF2Hasher(iterations=300_000),
+    PBKDF2Hasher(iterations=600_000),
+]
+
+
+def describe(hasher):
+    if isinstance(hasher, ScryptHasher):
+        return f"scrypt n=2^{hasher.n.bit_length() - 1} r={hasher.r} p={hasher.p}"
+    return f"pbkdf2_sha256 iterations={hasher.iterations}"
+
+
+def verifies_per_second(pool, encoded, seconds, concurrency):
+    """Run verify() from `concurrency` threads for `seconds` and return the rate."""
+    deadline = time.perf_counter() + seconds
+    counts = [0] * concurrency
+
+    def worker(slot):
+        while time.perf_counter() < deadline:
+            pool.verify("correct horse battery staple", encoded)
+            counts[slot] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as threads:
+        list(threads.map(worker, range(concurrency)))
+    return sum(counts) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration of each measurement")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="process pool size")
+    args = parser.parse_args()
+
+    print(f"{'hasher':<36} {'hash ms':>9} {'inline/s':>10} {'pool/s':>10}")
+    for hasher in COST_SETTINGS:
+        inline = PasswordHasherPool(hasher, workers=0)
+        pooled = PasswordHasherPool(hasher, workers=args.workers)
+        started = time.perf_counter()
+        encoded = inline.hash("correct horse battery staple")
+        hash_ms = (time.perf_counter() - started) * 1000
+
+        pooled.verify("warm up the workers", encoded)
+        inline_rate = verifies_per_second(inline, encoded, args.seconds, 1)
+        pooled_rate = verifies_per_second(pooled, encoded, args.seconds, args.workers * 2)
+        pooled.shutdown()
+        print(f"{describe(hasher):<36} {hash_ms:>9.1f} {inline_rate:>10.1f} {pooled_rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Batch account validation against the per-row helpers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_validation [--rows 1000000]
+"""
+import argparse
+import random
+import string
+import time
+
+import pandas as pd
+
+import validation
+
+
+def generate_accounts(rows, seed=42):
+    """Synthetic accounts with roughly one in ten rows failing some check."""
+    rng = random.Random(seed)
+    domains = ["example.com", "corp.io", "gmail.com", "bad..domain.com", "nodot"]
+    industries = validation.INDUSTRIES + ["Unknown"]
+    accounts = {"full_name": [], "username": [], "email": [], "password": [], "industry": []}
+    for i in range(rows):
+        user = "".join(rng.choices(string.ascii_lowercase, k=8))
+        accounts["full_name"].append(f"User {i}")
+        accounts["username"].append(f"{user}{i}")
+        accounts["email"].append(f"{user}{i}@{rng.choices(domains, weights=[60, 30, 6, 2, 2])[0]}")
+        accounts["password"].append(rng.choice(["Passw0rd!", "weakpass", "S3cure#Pass", "short1!"]))
+        accounts["industry"].append(rng.choices(industries, weights=[24, 24, 24, 24, 4])[0])
+    return pd.DataFrame(accounts)
+
+
+def per_row(frame):
+    """The row-at-a-time equivalent of validate_accounts for Users, using the single-value helpers."""
+    valid = []
+    for full_name, username, email, password, industry in frame.itertuples(index=False, name=None):
+        valid.append(
+            bool(full_name and username and email and password)
+            and validation.is_valid_email(email)
+            and validation.is_valid_password(password)
+            and industry in validation.INDUSTRIES
+        )
+    return valid
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of candidate accounts")
+    args = parser.parse_args()
+
+    frame, generate_seconds = timed(generate_accounts, args.rows)
+    print(f"generated {args.rows} rows in {generate_seconds:.1f} s")
+
+    print(f"{'method':<28} {'seconds':>9} {'rows/s':>12}")
+    for name, func, argument in [
+        ("per-row helpers", per_row, frame),
+        ("valid_emails", validation.valid_emails, frame["email"]),
+        ("valid_passwords", validation.valid_passwords, frame["password"]),
+        ("validate_accounts (User)", validation.validate_accounts, frame),
+    ]:
+        _, seconds = timed(func, argument)
+        print(f"{name:<28} {seconds:>9.2f} {args.rows / seconds:>12,.0f}")
+    _, seconds = timed(validation.validate_accounts, frame, role="HR")
+    print(f"{'validate_accounts (HR)':<28} {seconds:>9.2f} {args.rows / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
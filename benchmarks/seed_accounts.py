@@ -0,0 +1,133 @@
+"""Seed a database with synthetic User and HR accounts for the benchmarks.
+
+Run from the repository root against a dedicated benchmark database:
+
+    python -m benchmarks.seed_accounts --users 1000000 [--hr-share 0.05] [--seed 42] [--reset]
+
+The database comes from --dsn or HIREZY_DATABASE_URL. Rows are generated in
+chunks and loaded with COPY; the same --seed always produces the same accounts.
+Every seeded account has the password BENCH_PASSWORD, and its username and
+email start with "bench_" so --reset can remove exactly the seeded rows.
+"""
+import argparse
+import io
+import os
+import time
+
+import numpy as np
+
+import hashing
+from db import Database
+from validation import INDUSTRIES
+
+
+BENCH_PASSWORD = "Bench#Passw0rd"
+USERNAME_PREFIX = "bench_"
+FIRST_NAMES = [
+    "Aisha", "Ben", "Carlos", "Dana", "Elif", "Farid", "Grace", "Hiro", "Ines", "Jonas",
+    "Kavya", "Liam", "Maya", "Noah", "Olga", "Priya", "Quinn", "Rosa", "Sami", "Tariq",
+]
+LAST_NAMES = [
+    "Anders", "Barros", "Chen", "Dubois", "Eze", "Fischer", "Garcia", "Haddad", "Ito", "Jensen",
+    "Kowalski", "Lopez", "Mensah", "Nakamura", "Okafor", "Patel", "Rossi", "Silva", "Tanaka", "Weber",
+]
+USER_DOMAINS = ["gmail.com", "outlook.com", "yahoo.com", "proton.me", "mail.com"]
+HR_DOMAINS = ["acme.io", "globex.com", "initech.com", "umbrella.org", "hooli.com"]
+# Registrations are spread over these years, growing towards the end of the range.
+FIRST_YEAR, LAST_YEAR = 2015, 2025
+INDUSTRY_WEIGHTS = [0.4, 0.25, 0.2, 0.15]
+CHUNK_ROWS = 250_000
+
+
+def generate_chunk(rng, start, rows, hr_share, password_hash, role_ids):
+    """CSV text for COPY into users, for accounts start .. start + rows - 1."""
+    numbers = np.arange(start, start + rows)
+    is_hr = rng.random(rows) < hr_share
+    first = rng.integers(len(FIRST_NAMES), size=rows)
+    last = rng.integers(len(LAST_NAMES), size=rows)
+    industry = rng.choice(len(INDUSTRIES), size=rows, p=INDUSTRY_WEIGHTS)
+    domain = rng.integers(len(USER_DOMAINS), size=rows)
+    # sqrt of a uniform value skews registrations towards recent dates.
+    span = np.datetime64(f"{LAST_YEAR + 1}-01-01T00:00:00") - np.datetime64(f"{FIRST_YEAR}-01-01T00:00:00")
+    offsets = (np.sqrt(rng.random(rows)) * span.astype(np.int64)).astype("timedelta64[s]")
+    registered_at = np.datetime_as_string(np.datetime64(f"{FIRST_YEAR}-01-01T00:00:00") + offsets, unit="s")
+
+    lines = []
+    for number, hr, f, l, i, d, at in zip(
+        numbers.tolist(), is_hr.tolist(), first.tolist(), last.tolist(),
+        industry.tolist(), domain.tolist(), registered_at.tolist(),
+    ):
+        username = f"{USERNAME_PREFIX}{number:08d}"
+        if hr:
+            lines.append(
+                f"{FIRST_NAMES[f]} {LAST_NAMES[l]},{username},{username}@{HR_DOMAINS[d]},{password_hash},"
+                f",{role_ids['HR']},{at}\n"
+            )
+        else:
+            lines.append(
+                f"{FIRST_NAMES[f]} {LAST_NAMES[l]},{username},{username}@{USER_DOMAINS[d]},{password_hash},"
+                f"{INDUSTRIES[i]},{role_ids['User']},{at}\n"
+            )
+    return "".join(lines)
+
+
+def reset(db):
+    """Delete every seeded account and return how many were removed."""
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM users WHERE username LIKE %s", (USERNAME_PREFIX.replace("_", "\\_") + "%",))
+            deleted = cur.rowcount
+            conn.commit()
+    return deleted
+
+
+def seed(db, users, hr_share=0.05, seed=42, chunk_rows=CHUNK_ROWS, progress=None):
+    """Load `users` synthetic accounts with COPY and return the number of rows written."""
+    rng = np.random.default_rng(seed)
+    # One hash for every account: hashing millions of passwords would dominate seeding.
+    password_hash = hashing.hash_password(BENCH_PASSWORD)
+    role_ids = {"User": db.role_id("User"), "HR": db.role_id("HR")}
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            for start in range(0, users, chunk_rows):
+                rows = min(chunk_rows, users - start)
+                text = generate_chunk(rng, start, rows, hr_share, password_hash, role_ids)
+                # Each chunk is one COPY statement, so the rollup triggers fire once per chunk.
+                cur.copy_expert(
+                    "COPY users (full_name, username, email, password, industry, role_id, registered_at) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    io.StringIO(text),
+                )
+                conn.commit()
+                if progress:
+                    progress(start + rows)
+            cur.execute("ANALYZE users")
+            conn.commit()
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000, help="number of accounts to create (10k to 10M)")
+    parser.add_argument("--hr-share", type=float, default=0.05, help="fraction of accounts that are HR")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--reset", action="store_true", help="delete previously seeded accounts first")
+    parser.add_argument("--dsn", default=os.environ.get("HIREZY_DATABASE_URL"), help="database URL")
+    args = parser.parse_args()
+
+    db = Database(dsn=args.dsn)
+    db.initialize()
+    if args.reset:
+        print(f"deleted {reset(db)} seeded accounts")
+
+    started = time.perf_counter()
+
+    def progress(done):
+        elapsed = time.perf_counter() - started
+        print(f"{done:>12,} rows  {elapsed:7.1f} s  {done / elapsed:>10,.0f} rows/s")
+
+    seed(db, args.users, hr_share=args.hr_share, seed=args.seed, progress=progress)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,89 +1,535 @@
+import itertools
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2 import errors, extensions
+
+import metrics
+from migrations import MigrationRunner
+
+
+Statement = namedtuple("Statement", ["sql", "prepare_sql", "execute_sql"])
+
+_statements = {}
+
+
+def register_statement(name, sql):
+    """Register a %s-parameterized query to run as a named server-side prepared statement."""
+    if not name.isidentifier():
+        raise ValueError(f"Invalid statement name '{name}'.")
+    parts = sql.split("%s")
+    server_sql = parts[0] + "".join(f"${i}{part}" for i, part in enumerate(parts[1:], start=1))
+    param_count = len(parts) - 1
+    if param_count:
+        execute_sql = f"EXECUTE {name} ({', '.join(['%s'] * param_count)})"
+    else:
+        execute_sql = f"EXECUTE {name}"
+    _statements[name] = Statement(sql, f"PREPARE {name} AS {server_sql}", execute_sql)
+    return name
+
+
+def get_statement(name):
+    """Return the registered Statement for `name`."""
+    return _statements[name]
+
+
+class PreparingConnection(extensions.connection):
+    """Connection that remembers which registered statements are prepared on it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ReplicaError(psycopg2.OperationalError):
+    """A replica connection failed while in use; read-only work can be retried on the primary."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of psycopg2 connections shared by every session of the process."""
+
+    def __init__(self, connect_kwargs, minconn=1, maxconn=10, timeout=5.0, health_check_after=30.0):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Pool size must satisfy 0 <= minconn <= maxconn and maxconn >= 1.")
+        self.connect_kwargs = connect_kwargs
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self._idle = deque()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "created": 0,
+            "discarded": 0,
+            "health_checks": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+        for _ in range(minconn):
+            self._idle.append((self._new_connection(), time.monotonic()))
+
+    def _new_connection(self):
+        conn = psycopg2.connect(**self.connect_kwargs)
+        with self._cond:
+            self._size += 1
+            self._stats["created"] += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_since):
+        """Check an idle connection before handing it out again."""
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.health_check_after:
+            return True
+        with self._cond:
+            self._stats["health_checks"] += 1
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+    def getconn(self, timeout=None):
+        """Check out a connection, waiting up to `timeout` seconds for one to free up."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed.")
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {timeout:.1f}s "
+                            f"(pool size {self.maxconn})."
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                idle = self._idle.pop() if self._idle else None
+                if idle is None:
+                    # Reserve the slot before connecting outside the lock.
+                    self._size += 1
+            if idle is None:
+                try:
+                    conn = psycopg2.connect(**self.connect_kwargs)
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["created"] += 1
+                break
+            conn, idle_since = idle
+            if self._is_healthy(conn, idle_since):
+                break
+            self._discard(conn)
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += waited
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, closing it if it is broken."""
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard or conn.closed or self._closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """Return a snapshot of pool usage for sizing."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._size - len(self._idle),
+                waiting=self._waiting,
+                minconn=self.minconn,
+                maxconn=self.maxconn,
+            )
+        return stats
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_initialized = set()
+_initialized_lock = threading.Lock()
+_roles = {}
+_roles_lock = threading.Lock()
+_replica_counter = itertools.count()
+# Replicas that failed are skipped until the monotonic time stored here.
+_replicas_down = {}
+# Seconds to wait for a replica to accept a connection (unless its DSN sets connect_timeout),
+# and to keep routing reads to the primary after a replica failed.
+REPLICA_CONNECT_TIMEOUT = 3
+REPLICA_COOLDOWN = 30.0
+# Extra psycopg2.connect() arguments for synchronous connections; timed cursors only with HIREZY_METRICS.
+_instrumentation = {"cursor_factory": metrics.TimedCursor} if metrics.ENABLED else {}
 
 
 class Database:
-    def __init__(self, host="localhost", database="hrms", user="openpg", password="openpgpwd"):
+    def __init__(self, host="localhost", database="hrms", user="openpg", password="openpgpwd",
+                 dsn=None, replica_dsns=(),
+                 pooled=False, pool_min=1, pool_max=10, pool_timeout=5.0, pool_health_check_after=30.0):
         self.host = host
         self.database = database
         self.user = user
         self.password = password
+        self.dsn = dsn
+        self.replica_dsns = tuple(replica_dsns)
+        self.pooled = pooled
+        self.pool_min = pool_min
+        self.pool_max = pool_max
+        self.pool_timeout = pool_timeout
+        self.pool_health_check_after = pool_health_check_after
+
+    def _connect_kwargs(self, replica_dsn=None):
+        if replica_dsn:
+            # Without a timeout an unreachable host blocks every read for the OS TCP timeout.
+            if "connect_timeout" in extensions.parse_dsn(replica_dsn):
+                return {"dsn": replica_dsn}
+            return {"dsn": replica_dsn, "connect_timeout": REPLICA_CONNECT_TIMEOUT}
+        if self.dsn:
+            return {"dsn": self.dsn}
+        return {
+            "host": self.host,
+            "database": self.database,
+            "user": self.user,
+            "password": self.password,
+        }
+
+    def _server_key(self, replica_dsn=None):
+        if replica_dsn:
+            return replica_dsn
+        if self.dsn:
+            return self.dsn
+        return (self.host, self.database, self.user)
 
-    def connect(self):
-        """Create and return a new database connection."""
-        return psycopg2.connect(
-            host=self.host,
-            database=self.database,
-            user=self.user,
-            password=self.password
-        )
+    def _pick_replica(self):
+        """Return the next healthy replica DSN in round-robin order, or None when there is none."""
+        if not self.replica_dsns:
+            return None
+        start = next(_replica_counter)
+        now = time.monotonic()
+        for offset in range(len(self.replica_dsns)):
+            replica_dsn = self.replica_dsns[(start + offset) % len(self.replica_dsns)]
+            if _replicas_down.get(replica_dsn, 0.0) <= now:
+                return replica_dsn
+        return None
+
+    @staticmethod
+    def _mark_replica_down(replica_dsn):
+        """Route reads away from a failed replica for REPLICA_COOLDOWN seconds."""
+        _replicas_down[replica_dsn] = time.monotonic() + REPLICA_COOLDOWN
+
+    @property
+    def pool(self):
+        """Process-wide pool for the primary, created on first use."""
+        return self._pool_for()
+
+    def _pool_for(self, replica_dsn=None):
+        key = self._server_key(replica_dsn)
+        pool = _pools.get(key)
+        if pool is None:
+            with _pools_lock:
+                pool = _pools.get(key)
+                if pool is None:
+                    pool = ConnectionPool(
+                        dict(self._connect_kwargs(replica_dsn), connection_factory=PreparingConnection, **_instrumentation),
+                        minconn=self.pool_min,
+                        maxconn=self.pool_max,
+                        timeout=self.pool_timeout,
+                        health_check_after=self.pool_health_check_after,
+                    )
+                    _pools[key] = pool
+        return pool
+
+    @contextmanager
+    def connect(self, readonly=False):
+        """Yield a database connection, committing on success and rolling back on error.
+
+        Read-only callers are routed to a replica when any are configured, falling
+        back to the primary if the replica cannot be reached. A replica that fails
+        is skipped for REPLICA_COOLDOWN seconds; one failing after checkout raises
+        ReplicaError, which fetchone() and fetchall() answer by retrying on the primary.
+        """
+        replica_dsn = self._pick_replica() if readonly else None
+        started = time.perf_counter()
+        if not self.pooled:
+            try:
+                conn = psycopg2.connect(**self._connect_kwargs(replica_dsn), **_instrumentation)
+            except psycopg2.OperationalError:
+                if replica_dsn is None:
+                    raise
+                self._mark_replica_down(replica_dsn)
+                replica_dsn = None
+                conn = psycopg2.connect(**self._connect_kwargs(), **_instrumentation)
+            if metrics.ENABLED:
+                metrics.record_acquire("replica" if replica_dsn else "primary", time.perf_counter() - started)
+            try:
+                with conn:
+                    yield conn
+            except (psycopg2.InterfaceError, psycopg2.OperationalError) as e:
+                self._replica_failed(replica_dsn, conn, e)
+                raise
+            finally:
+                conn.close()
+            return
+
+        try:
+            pool = self._pool_for(replica_dsn)
+            conn = pool.getconn()
+        except (psycopg2.OperationalError, PoolTimeout) as e:
+            if replica_dsn is None:
+                if metrics.ENABLED:
+                    metrics.record_error("connect", e)
+                raise
+            self._mark_replica_down(replica_dsn)
+            replica_dsn = None
+            pool = self.pool
+            conn = pool.getconn()
+        if metrics.ENABLED:
+            metrics.record_acquire("replica" if replica_dsn else "primary", time.perf_counter() - started)
+        broken = False
+        try:
+            with conn:
+                yield conn
+        except (psycopg2.InterfaceError, psycopg2.OperationalError) as e:
+            broken = True
+            self._replica_failed(replica_dsn, conn, e)
+            raise
+        finally:
+            pool.putconn(conn, discard=broken or conn.closed)
+
+    def _replica_failed(self, replica_dsn, conn, error):
+        """Turn a replica connection lost mid-use into ReplicaError; statement errors pass through."""
+        if replica_dsn is None or not conn.closed or isinstance(error, ReplicaError):
+            return
+        self._mark_replica_down(replica_dsn)
+        raise ReplicaError(f"Replica connection lost: {error}") from error
+
+    def _fetch(self, name, params, fetch, readonly):
+        if readonly and self.replica_dsns:
+            try:
+                with self.connect(readonly=True) as conn:
+                    with conn.cursor() as cur:
+                        return fetch(self.execute(cur, name, params))
+            except ReplicaError:
+                # Reads are safe to repeat; the replica is now skipped, so run it on the primary.
+                pass
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                return fetch(self.execute(cur, name, params))
+
+    def fetchone(self, name, params=(), readonly=True):
+        """Run a registered statement (on a replica unless readonly=False) and return its first row."""
+        return self._fetch(name, params, lambda cur: cur.fetchone(), readonly)
+
+    def fetchall(self, name, params=(), readonly=True):
+        """Run a registered statement (on a replica unless readonly=False) and return all of its rows."""
+        return self._fetch(name, params, lambda cur: cur.fetchall(), readonly)
+
+    @staticmethod
+    def execute(cur, name, params=()):
+        """Run a registered statement, preparing it on the cursor's connection on first use.
+
+        Connections that cannot hold prepared statements (unpooled ones) run the plain
+        query instead. When the server's prepared statements drifted from what the
+        connection tracked (e.g. after DEALLOCATE or DISCARD ALL), the tracking is
+        corrected and the statement retried; inside a transaction the attempt runs
+        under a savepoint, so the caller's earlier work survives the retry.
+        """
+        sql, prepare_sql, execute_sql = _statements[name]
+        conn = cur.connection
+        prepared = getattr(conn, "prepared", None)
+        if prepared is None:
+            cur.execute(sql, params)
+            return cur
+
+        in_transaction = conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE
+        if in_transaction:
+            cur.execute("SAVEPOINT prepared_statement")
+
+        def recover():
+            if in_transaction:
+                cur.execute("ROLLBACK TO SAVEPOINT prepared_statement")
+            else:
+                conn.rollback()
+
+        try:
+            if name not in prepared:
+                cur.execute(prepare_sql)
+                prepared.add(name)
+            cur.execute(execute_sql, params)
+        except errors.DuplicatePreparedStatement:
+            # Prepared on the server already, only not tracked here.
+            recover()
+            prepared.add(name)
+            cur.execute(execute_sql, params)
+        except errors.InvalidSqlStatementName:
+            # Deallocated on the server; prepare it again.
+            recover()
+            cur.execute(prepare_sql)
+            prepared.add(name)
+            cur.execute(execute_sql, params)
+        if in_transaction:
+            # A second cursor, so the statement's results on `cur` are kept.
+            with conn.cursor() as release:
+                release.execute("RELEASE SAVEPOINT prepared_statement")
+        return cur
+
+    def explain(self, query, params=(), analyze=False):
+        """Return the JSON plan of a registered statement name or a raw query."""
+        if query in _statements:
+            query = _statements[query].sql
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        with self.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"EXPLAIN ({options}) {query}", params)
+                plan = cur.fetchone()[0][0]["Plan"]
+            conn.rollback()
+        return plan
+
+    @staticmethod
+    def plan_nodes(plan):
+        """Flatten a JSON plan into a list of its nodes, root first."""
+        nodes = [plan]
+        for child in plan.get("Plans", []):
+            nodes.extend(Database.plan_nodes(child))
+        return nodes
+
+    def scans(self, query, params=()):
+        """Return (node type, relation or index name) for every scan in a query's plan.
+
+        Useful to assert that a hot query stays on its index, e.g. that
+        ("Index Only Scan", "users_role_registered_at_id_idx") is in the result.
+        """
+        return [
+            (node["Node Type"], node.get("Index Name") or node.get("Relation Name"))
+            for node in self.plan_nodes(self.explain(query, params))
+            if "Scan" in node["Node Type"]
+        ]
+
+    def pool_stats(self):
+        """Return usage statistics of the primary pool (and replica pools), or None when pooling is off."""
+        if not self.pooled:
+            return None
+        stats = self.pool.stats()
+        if self.replica_dsns:
+            # None marks a replica whose pool has not been created yet (or cannot be reached).
+            stats["replicas"] = [
+                _pools[key].stats() if key in _pools else None
+                for key in map(self._server_key, self.replica_dsns)
+            ]
+        return stats
 
     def initialize(self):
-        """Initialize tables and default roles."""
+        """Bring the schema up to date; runs the migrations at most once per process."""
+        key = self._server_key()
+        if key in _initialized:
+            return
+        with _initialized_lock:
+            if key in _initialized:
+                return
+            MigrationRunner(self).run()
+            _initialized.add(key)
+
+    def _load_roles(self):
         with self.connect() as conn:
             with conn.cursor() as cur:
-                self._create_tables(cur)
-                self._initialize_roles(cur)
-                self._initialize_admin(cur)
-            conn.commit()
-
-    def _create_tables(self, cur):
-        """Create necessary tables if they don't exist."""
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS roles (
-                id SERIAL PRIMARY KEY,
-                name TEXT UNIQUE
-            );
-        ''')
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                full_name TEXT,
-                username TEXT UNIQUE,
-                email TEXT UNIQUE,
-                password TEXT,
-                industry TEXT,
-                role_id INTEGER REFERENCES roles(id),
-                registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        ''')
-
-        cur.execute('''
-            DO $$
-            BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM information_schema.columns
-                    WHERE table_name='users' AND column_name='registered_at'
-                ) THEN
-                    ALTER TABLE users ADD COLUMN registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
-                END IF;
-            END $$;
-        ''')
-    
-
-    def _initialize_roles(self, cur):
-        """Initialize default roles."""
-        roles = ["Admin", "HR", "User"]
-        for role in roles:
-            cur.execute(
-                'INSERT INTO roles (name) VALUES (%s) ON CONFLICT (name) DO NOTHING',
-                (role,)
-            )
+                cur.execute('SELECT name, id FROM roles')
+                return dict(cur.fetchall())
+
+    def roles(self):
+        """Return the role name -> id mapping, loaded once per process and server."""
+        key = self._server_key()
+        roles = _roles.get(key)
+        if roles is None:
+            with _roles_lock:
+                roles = _roles.get(key)
+                if roles is None:
+                    roles = self._load_roles()
+                    _roles[key] = roles
+        return roles
+
+    def role_id(self, role_name):
+        """Return the id of a role from the in-process cache."""
+        role_id = self.roles().get(role_name)
+        if role_id is None:
+            # The role may have been added since the cache was loaded.
+            self.invalidate_roles()
+            role_id = self.roles().get(role_name)
+        if role_id is None:
+            raise ValueError(f"Role '{role_name}' not found. Ensure roles are initialized.")
+        return role_id
+
+    def role_name(self, role_id):
+        """Return the name of a role id from the in-process cache."""
+        names = {cached_id: name for name, cached_id in self.roles().items()}
+        if role_id not in names:
+            self.invalidate_roles()
+            names = {cached_id: name for name, cached_id in self.roles().items()}
+        if role_id not in names:
+            raise ValueError(f"Role id {role_id} not found.")
+        return names[role_id]
 
-    def _initialize_admin(self, cur):
-        """Create a default Admin account if it doesn't exist."""
-        cur.execute('SELECT id FROM roles WHERE name = %s', ("Admin",))
-        admin_role_id = cur.fetchone()[0]
-        cur.execute(
-            '''
-            INSERT INTO users (full_name, username, email, password, industry, role_id)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (username) DO NOTHING
-            ''',
-            ("Super Admin", "admin", "admin@example.com", self._hash_password("admin123"), "Administration", admin_role_id)
-        )
+    def invalidate_roles(self):
+        """Drop the cached roles so the next lookup reloads them."""
+        with _roles_lock:
+            _roles.pop(self._server_key(), None)
 
     @staticmethod
     def _hash_password(password):
         """Helper function to hash passwords."""
-        import hashlib
-        return hashlib.sha256(password.encode()).hexdigest()
+        import hashing
+        return hashing.hash_password(password)
@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Maximum number of points (per trace) handed to Plotly; set HIREZY_CHART_POINTS to change it.
+POINT_BUDGET = int(os.environ.get("HIREZY_CHART_POINTS", 1000))
+
+
+def _numeric(values):
+    """Plottable x values as float64, so datetimes can be compared and interpolated."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("int64").to_numpy(dtype=np.float64)
+    return values.to_numpy(dtype=np.float64)
+
+
+def lttb(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps to draw (x, y) with `threshold` points.
+
+    The first and last points are always kept; each bucket in between keeps the
+    point forming the largest triangle with its neighbours, which preserves the
+    visual shape of a line far better than taking every n-th point.
+    """
+    x, y = _numeric(x), np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    kept = np.empty(threshold, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        kept[bucket + 1] = previous
+    return kept
+
+
+def minmax(x, y, buckets):
+    """Indices of the minimum and maximum of `y` within each of `buckets` equal-width x ranges.
+
+    Unlike LTTB this never drops a spike, so it suits counts where outliers matter.
+    """
+    x, y = _numeric(x), np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if 2 * buckets >= n:
+        return np.arange(n)
+    bucket = np.minimum(((x - x[0]) / max(x[-1] - x[0], 1) * buckets).astype(int), buckets - 1)
+    frame = pd.DataFrame({"bucket": bucket, "y": y})
+    grouped = frame.groupby("bucket")["y"]
+    kept = np.union1d(grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy())
+    return np.union1d(kept, [0, n - 1])
+
+
+def reduce_series(frame, x, y, budget=None, method="lttb", by=None):
+    """Rows of `frame` that keep each line within `budget` points; x must be sorted within each line.
+
+    `method` is "lttb" or "minmax"; with `by`, every group (trace) gets its own budget.
+    """
+    budget = budget or POINT_BUDGET
+    if by is not None:
+        parts = [reduce_series(group, x, y, budget, method) for _, group in frame.groupby(by, sort=False)]
+        return pd.concat(parts) if parts else frame
+    frame = frame.reset_index(drop=True)
+    if len(frame) <= budget:
+        return frame
+    if method == "minmax":
+        kept = minmax(frame[x], frame[y], max((budget - 2) // 2, 1))
+    else:
+        kept = lttb(frame[x], frame[y], budget)
+    return frame.iloc[kept]
+
+
+def bin_counts(frame, x, count, budget=None, by=None):
+    """Sum `count` into at most `budget` equal-width bins of `x` (per `by` group) for scatter and bar charts.
+
+    Each bin is labelled with its first x value, so bars and points stay on the original axis.
+    """
+    budget = budget or POINT_BUDGET
+    keys = [by] if isinstance(by, str) else list(by or [])
+    if frame.empty or frame[x].nunique() <= budget:
+        return frame
+    values = _numeric(frame[x])
+    low, high = values.min(), values.max()
+    bins = np.minimum(((values - low) / max(high - low, 1) * budget).astype(int), budget - 1)
+    binned = (
+        frame.assign(_bin=bins)
+        .groupby(["_bin"] + keys, as_index=False, sort=True)
+        .agg(**{x: (x, "min"), count: (count, "sum")})
+    )
+    return binned.drop(columns="_bin")
@@ -0,0 +1,63 @@
+import csv
+import io
+import itertools
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def export_csv(rows, columns, file=None):
+    """Write rows as CSV into a binary file and return it rewound; an in-memory BytesIO when none is given."""
+    file = io.BytesIO() if file is None else file
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    writer.writerows(rows)
+    text.flush()
+    text.detach()
+    file.seek(0)
+    return file
+
+
+def export_parquet(rows, columns, file=None, row_group_size=25_000):
+    """Write rows as Parquet, one row group per `row_group_size` rows, and return the file rewound.
+
+    Only one row group of rows is held as Python objects at a time; the encoded
+    file goes to `file`, an in-memory BytesIO when none is given. Requires pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    file = io.BytesIO() if file is None else file
+    writer = None
+    for batch in _batches(rows, row_group_size):
+        table = pa.Table.from_arrays([pa.array(values) for values in zip(*batch)], names=list(columns))
+        if writer is None:
+            # A column that is all nulls in the first batch is typed as text, so later
+            # batches with values (e.g. industry) still fit the file's schema.
+            schema = pa.schema([
+                pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                for field in table.schema
+            ])
+            writer = pq.ParquetWriter(file, schema)
+        if table.schema != writer.schema:
+            table = table.cast(writer.schema)
+        writer.write_table(table)
+    if writer is None:
+        writer = pq.ParquetWriter(file, pa.schema([(column, pa.null()) for column in columns]))
+    writer.close()
+    file.seek(0)
+    return file
+
+
+def export_bytes(rows, columns, file_format="CSV"):
+    """The encoded export ("CSV" or "Parquet") as bytes, the form st.download_button serves."""
+    if file_format == "Parquet":
+        return export_parquet(rows, columns).getvalue()
+    return export_csv(rows, columns).getvalue()
@@ -0,0 +1,43 @@
+import hashlib
+import json
+import pickle
+
+import pandas as pd
+
+from cache import TTLCache
+
+
+# Serialized figures shared by every Streamlit session of the process. Entries are
+# keyed by a digest of the figure's input data, so a figure is rebuilt only when
+# the data it is drawn from actually changed.
+_figures = TTLCache(max_entries=256, ttl=3600.0)
+
+
+def digest(data):
+    """Stable fingerprint of a figure's input: a DataFrame, or any picklable value."""
+    hasher = hashlib.blake2b(digest_size=16)
+    if isinstance(data, pd.DataFrame):
+        hasher.update(repr(list(data.columns)).encode())
+        hasher.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    else:
+        hasher.update(pickle.dumps(data))
+    return hasher.hexdigest()
+
+
+def cached_figure(name, data, build):
+    """Return the figure `build(data)` as a plain dict, building it only on a cache miss.
+
+    The cache stores the figure JSON rather than the Figure object, which is
+    cheaper to keep and cannot be mutated by callers.
+    """
+    key = (name, digest(data))
+    figure_json = _figures.get(key)
+    if figure_json is None:
+        figure_json = build(data).to_json()
+        _figures.set(key, figure_json)
+    return json.loads(figure_json)
+
+
+def figure_cache_stats():
+    """Return hit/miss counters of the figure cache."""
+    return _figures.stats()
@@ -0,0 +1,232 @@
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data):
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+class ScryptHasher:
+    """Memory-hard scrypt hashes encoded as scrypt$n$r$p$salt$digest."""
+
+    algorithm = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1, salt_size=16, dklen=32):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.salt_size = salt_size
+        self.dklen = dklen
+
+    def _derive(self, password, salt, n, r, p, dklen):
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, dklen=dklen, maxmem=256 * n * r + 2 ** 20
+        )
+
+    def hash(self, password):
+        """Hash a password with a fresh random salt."""
+        salt = os.urandom(self.salt_size)
+        digest = self._derive(password, salt, self.n, self.r, self.p, self.dklen)
+        return f"{self.algorithm}${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password, encoded):
+        """Check a password against an encoded hash produced by this hasher."""
+        _, n, r, p, salt, digest = encoded.split("$")
+        expected = _b64decode(digest)
+        actual = self._derive(password, _b64decode(salt), int(n), int(r), int(p), len(expected))
+        return hmac.compare_digest(actual, expected)
+
+    def needs_rehash(self, encoded):
+        """True when the hash was made with different cost parameters."""
+        _, n, r, p, _, _ = encoded.split("$")
+        return (int(n), int(r), int(p)) != (self.n, self.r, self.p)
+
+
+class PBKDF2Hasher:
+    """PBKDF2-HMAC-SHA256 hashes encoded as pbkdf2_sha256$iterations$salt$digest."""
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=600_000, salt_size=16):
+        self.iterations = iterations
+        self.salt_size = salt_size
+
+    def hash(self, password):
+        """Hash a password with a fresh random salt."""
+        salt = os.urandom(self.salt_size)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+        return f"{self.algorithm}${self.iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password, encoded):
+        """Check a password against an encoded hash produced by this hasher."""
+        _, iterations, salt, digest = encoded.split("$")
+        actual = hashlib.pbkdf2_hmac("sha256", password.encode(), _b64decode(salt), int(iterations))
+        return hmac.compare_digest(actual, _b64decode(digest))
+
+    def needs_rehash(self, encoded):
+        """True when the hash was made with a different iteration count."""
+        return int(encoded.split("$")[1]) != self.iterations
+
+
+class LegacySHA256Hasher:
+    """Unsalted SHA-256 hex digests stored before salted hashing; verify-only."""
+
+    algorithm = "sha256"
+
+    def hash(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(self.hash(password), encoded)
+
+    def needs_rehash(self, encoded):
+        return True
+
+
+HASHERS = {
+    ScryptHasher.algorithm: ScryptHasher,
+    PBKDF2Hasher.algorithm: PBKDF2Hasher,
+}
+
+
+def identify(encoded, default):
+    """Return a hasher able to verify `encoded`, reusing `default` when the algorithm matches."""
+    algorithm = encoded.split("$", 1)[0] if "$" in encoded else LegacySHA256Hasher.algorithm
+    if algorithm == default.algorithm:
+        return default
+    if algorithm == LegacySHA256Hasher.algorithm:
+        return LegacySHA256Hasher()
+    if algorithm not in HASHERS:
+        raise ValueError(f"Unknown password hash algorithm '{algorithm}'.")
+    return HASHERS[algorithm]()
+
+
+def _hash(hasher, password):
+    return hasher.hash(password)
+
+
+def _hash_batch(hasher, passwords):
+    return [hasher.hash(password) for password in passwords]
+
+
+def _verify(hasher, password, encoded):
+    verifier = identify(encoded, hasher)
+    if not verifier.verify(password, encoded):
+        return False, False
+    return True, verifier is not hasher or hasher.needs_rehash(encoded)
+
+
+class PasswordHasherPool:
+    """Runs hashing and verification in a bounded process pool so CPU-heavy KDFs scale across cores.
+
+    At most `max_pending` jobs are queued at once; further callers block until
+    a worker frees up instead of piling unbounded work onto the pool.
+    With workers=0 everything runs inline in the calling thread.
+    """
+
+    def __init__(self, hasher=None, workers=None, max_pending=None):
+        self.hasher = hasher or ScryptHasher()
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._slots = threading.BoundedSemaphore(max_pending or max(self.workers, 1) * 4)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn rather than fork: the Streamlit server process is multi-threaded.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def _submit(self, func, *args):
+        if self.workers == 0:
+            return func(*args)
+        executor = self._get_executor()
+        with self._slots:
+            return executor.submit(func, *args).result()
+
+    def hash(self, password):
+        """Return the encoded hash of a password."""
+        return self._submit(_hash, self.hasher, password)
+
+    def hash_many(self, passwords, batch_size=256):
+        """Hash many passwords, spreading batches across the workers; keeps input order."""
+        passwords = list(passwords)
+        batches = [passwords[i:i + batch_size] for i in range(0, len(passwords), batch_size)]
+        if self.workers == 0:
+            return [encoded for batch in batches for encoded in _hash_batch(self.hasher, batch)]
+        hashed = []
+        for result in self._get_executor().map(_hash_batch, [self.hasher] * len(batches), batches):
+            hashed.extend(result)
+        return hashed
+
+    def verify(self, password, encoded):
+        """Return (matches, needs_rehash) for a password against a stored hash."""
+        return self._submit(_verify, self.hasher, password, encoded)
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def _default_hasher():
+    if os.environ.get("HIREZY_PASSWORD_HASHER", "scrypt") == PBKDF2Hasher.algorithm:
+        return PBKDF2Hasher(iterations=int(os.environ.get("HIREZY_PBKDF2_ITERATIONS", 600_000)))
+    return ScryptHasher(n=int(os.environ.get("HIREZY_SCRYPT_N", 2 ** 14)))
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool():
+    """Process-wide hasher pool configured from HIREZY_PASSWORD_HASHER / HIREZY_HASH_WORKERS."""
+    global _default_pool
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                workers = os.environ.get("HIREZY_HASH_WORKERS")
+                _default_pool = PasswordHasherPool(
+                    _default_hasher(), workers=int(workers) if workers is not None else None
+                )
+    return _default_pool
+
+
+def hash_password(password):
+    """Hash a password with the default hasher pool."""
+    return default_pool().hash(password)
+
+
+def verify_password(password, encoded):
+    """Return (matches, needs_rehash) using the default hasher pool."""
+    return default_pool().verify(password, encoded)
+
+
+_dummy_hash = None
+
+
+def dummy_hash():
+    """A hash of a random password at the default hasher's current parameters, computed once.
+
+    Verifying against it costs the same as verifying a real account, so logins for
+    unknown identifiers cannot be told apart by timing.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(secrets.token_urlsafe(16))
+    return _dummy_hash
@@ -1,5 +1,7 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
+import profiling
+import session_cookie
 
 
 def hr_view(auth_service):
@@ -21,6 +23,7 @@ def hr_view(auth_service):
             default_index=0,
             orientation="vertical",
         )
+    profiling.tag(page=selected)
 
     if selected == "Post Job":
         st.header("Post a New Job", divider="blue")
@@ -66,11 +69,14 @@ def hr_view(auth_service):
                         )
                         st.session_state["user"]["name"] = updated_full_name
                         st.session_state["user"]["email"] = updated_email
+                        if new_password:
+                            # The password change ended every session, this one included; start a fresh one.
+                            st.session_state["session_token"] = auth_service.create_session(st.session_state["user"])
                         st.success("Profile updated successfully.")
             except Exception as e:
                 st.error(f"An unexpected error occurred: {e}")
     
 
     elif selected == "Logout":
-        st.session_state.clear()
+        session_cookie.logout(auth_service)
         st.rerun()
\ No newline at end of file
@@ -0,0 +1,310 @@
+import bisect
+import functools
+import http.server
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from psycopg2 import extensions
+
+
+# Instrumentation is decided once at import: with HIREZY_METRICS unset, Database uses
+# plain cursors and `instrumented` returns classes untouched, so nothing is measured.
+ENABLED = os.environ.get("HIREZY_METRICS", "").lower() in ("1", "true", "yes", "on")
+
+# Upper bounds in seconds, shared by every histogram.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_operation = ContextVar("operation", default="-")
+_lock = threading.Lock()
+_queries = {}
+_rows = {}
+_errors = {}
+_acquires = {}
+_server = None
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (inf when it is past the last bucket)."""
+        if not self.count:
+            return None
+        seen = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += count
+            if seen >= q * self.count:
+                return bound
+        return float("inf")
+
+
+def current_operation():
+    """Name of the AuthService method whose queries are running, or "-" outside one."""
+    return _operation.get()
+
+
+def instrumented(cls):
+    """Class decorator tagging the queries of every public method with the method's name.
+
+    The outermost tagged call wins, so queries issued by helpers are attributed to
+    the method the page actually called.
+    """
+    if not ENABLED:
+        return cls
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not callable(method) or isinstance(method, (staticmethod, classmethod)):
+            continue
+        setattr(cls, name, _tagged(method, f"{cls.__name__}.{name}"))
+    return cls
+
+
+def _tagged(method, operation):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with tagged_operation(operation):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def tagged_operation(operation):
+    """Tag the queries run inside the block with `operation`, unless an enclosing call already tagged them."""
+    if _operation.get() != "-":
+        yield
+        return
+    token = _operation.set(operation)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+
+def tagged_steps(generator, operation):
+    """Return `generator` with the queries of each step tagged with `operation`.
+
+    A generator's body runs on every next(), after the method that created it
+    has returned, so `instrumented` cannot tag it. The tag is set only while a
+    step runs, never while the caller holds a yielded item.
+    """
+    if not ENABLED:
+        return generator
+    return _tagged_steps(generator, operation)
+
+
+def _tagged_steps(generator, operation):
+    try:
+        while True:
+            with tagged_operation(operation):
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        # Closing early runs the generator's cleanup (closing its cursor), which is tagged too.
+        with tagged_operation(operation):
+            generator.close()
+
+
+def statement_label(query):
+    """Short label of a query: the prepared statement name, or its leading SQL keyword."""
+    if isinstance(query, bytes):
+        query = query.decode(errors="replace")
+    words = query.split(None, 2)
+    if not words:
+        return "-"
+    keyword = words[0].upper()
+    if keyword == "EXECUTE" and len(words) > 1:
+        return words[1].split("(")[0]
+    return keyword.lower()
+
+
+def record_query(statement, seconds, rows):
+    key = (current_operation(), statement)
+    with _lock:
+        histogram = _queries.get(key)
+        if histogram is None:
+            histogram = _queries[key] = Histogram()
+        histogram.observe(seconds)
+        if rows > 0:
+            _rows[key] = _rows.get(key, 0) + rows
+
+
+def record_error(statement, error):
+    key = (current_operation(), statement, type(error).__name__)
+    with _lock:
+        _errors[key] = _errors.get(key, 0) + 1
+
+
+def record_acquire(target, seconds):
+    key = (current_operation(), target)
+    with _lock:
+        histogram = _acquires.get(key)
+        if histogram is None:
+            histogram = _acquires[key] = Histogram()
+        histogram.observe(seconds)
+
+
+class TimedCursor(extensions.cursor):
+    """Cursor recording the latency, row count and errors of every statement it executes."""
+
+    def execute(self, query, vars=None):
+        statement = statement_label(query)
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except Exception as e:
+            record_error(statement, e)
+            raise
+        record_query(statement, time.perf_counter() - started, self.rowcount)
+        return result
+
+
+def reset():
+    """Forget everything recorded so far."""
+    with _lock:
+        _queries.clear()
+        _rows.clear()
+        _errors.clear()
+        _acquires.clear()
+
+
+def snapshot():
+    """Return the recorded metrics as plain rows for display."""
+    with _lock:
+        queries = [
+            {
+                "operation": operation,
+                "statement": statement,
+                "calls": histogram.count,
+                "total_ms": histogram.sum * 1000,
+                "mean_ms": histogram.sum / histogram.count * 1000,
+                "p50_ms": histogram.quantile(0.5) * 1000,
+                "p95_ms": histogram.quantile(0.95) * 1000,
+                "rows": _rows.get((operation, statement), 0),
+            }
+            for (operation, statement), histogram in _queries.items()
+        ]
+        acquires = [
+            {
+                "operation": operation,
+                "target": target,
+                "acquires": histogram.count,
+                "mean_ms": histogram.sum / histogram.count * 1000,
+                "p95_ms": histogram.quantile(0.95) * 1000,
+            }
+            for (operation, target), histogram in _acquires.items()
+        ]
+        errors = [
+            {"operation": operation, "statement": statement, "error": error, "count": count}
+            for (operation, statement, error), count in _errors.items()
+        ]
+    return {"queries": queries, "acquires": acquires, "errors": errors}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram_lines(name, histogram, labels):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(BUCKETS + (float("inf"),), histogram.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f"{name}_bucket{_labels(**labels, le=le)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def render(pool_stats=None):
+    """Return every metric in the Prometheus text exposition format.
+
+    `pool_stats` (Database.pool_stats()) adds gauges for the primary pool.
+    """
+    lines = [
+        "# HELP hirezy_db_query_seconds Statement latency by AuthService method and statement.",
+        "# TYPE hirezy_db_query_seconds histogram",
+    ]
+    with _lock:
+        for (operation, statement), histogram in sorted(_queries.items()):
+            lines += _histogram_lines("hirezy_db_query_seconds", histogram, {"operation": operation, "statement": statement})
+        lines += [
+            "# HELP hirezy_db_rows_total Rows returned or affected by statements.",
+            "# TYPE hirezy_db_rows_total counter",
+        ]
+        for (operation, statement), rows in sorted(_rows.items()):
+            lines.append(f"hirezy_db_rows_total{_labels(operation=operation, statement=statement)} {rows}")
+        lines += [
+            "# HELP hirezy_db_errors_total Statements that raised, by error class.",
+            "# TYPE hirezy_db_errors_total counter",
+        ]
+        for (operation, statement, error), count in sorted(_errors.items()):
+            lines.append(f"hirezy_db_errors_total{_labels(operation=operation, statement=statement, error=error)} {count}")
+        lines += [
+            "# HELP hirezy_db_connection_acquire_seconds Time to obtain a database connection.",
+            "# TYPE hirezy_db_connection_acquire_seconds histogram",
+        ]
+        for (operation, target), histogram in sorted(_acquires.items()):
+            lines += _histogram_lines("hirezy_db_connection_acquire_seconds", histogram, {"operation": operation, "target": target})
+    if pool_stats:
+        for field in ("size", "idle", "in_use", "waiting"):
+            lines += [f"# TYPE hirezy_db_pool_{field} gauge", f"hirezy_db_pool_{field} {pool_stats[field]}"]
+        for field in ("checkouts", "timeouts"):
+            lines += [f"# TYPE hirezy_db_pool_{field}_total counter", f"hirezy_db_pool_{field}_total {pool_stats[field]}"]
+    return "\n".join(lines) + "\n"
+
+
+def serve(port, host="127.0.0.1", pool_stats=None):
+    """Serve render() at http://host:port/metrics from a daemon thread; later calls are no-ops.
+
+    `pool_stats` is an optional callable returning Database.pool_stats().
+    """
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render(pool_stats() if pool_stats else None).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
+
+
+def serve_from_env(pool_stats=None):
+    """Start the metrics endpoint when metrics are enabled and HIREZY_METRICS_PORT is set."""
+    port = os.environ.get("HIREZY_METRICS_PORT")
+    if ENABLED and port:
+        serve(int(port), pool_stats=pool_stats)
@@ -0,0 +1,274 @@
+import logging
+import zlib
+
+import psycopg2
+
+
+logger = logging.getLogger(__name__)
+
+# Key for pg_advisory_xact_lock so concurrent replicas migrate one at a time.
+MIGRATION_LOCK_KEY = zlib.crc32(b"hirezy.schema_migrations")
+
+MIGRATIONS = []
+
+
+class MigrationPending(Exception):
+    """Raised by a migration that cannot complete on this server yet.
+
+    Its changes are rolled back and its version is not recorded, so it is
+    retried on the next start; later migrations still run.
+    """
+
+
+def migration(version, description):
+    """Register a schema migration; migrations run in ascending version order."""
+    def decorator(func):
+        if any(existing[0] == version for existing in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}.")
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return decorator
+
+
+@migration(1, "Create roles and users tables")
+def _create_tables(cur, db):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS roles (
+            id SERIAL PRIMARY KEY,
+            name TEXT UNIQUE
+        );
+    ''')
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            full_name TEXT,
+            username TEXT UNIQUE,
+            email TEXT UNIQUE,
+            password TEXT,
+            industry TEXT,
+            role_id INTEGER REFERENCES roles(id),
+            registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+    cur.execute('ALTER TABLE users ADD COLUMN IF NOT EXISTS registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+
+
+@migration(2, "Seed default roles and the Admin account")
+def _seed_roles_and_admin(cur, db):
+    cur.execute(
+        '''
+        INSERT INTO roles (name) VALUES ('Admin'), ('HR'), ('User')
+        ON CONFLICT (name) DO NOTHING
+        '''
+    )
+    cur.execute(
+        '''
+        INSERT INTO users (full_name, username, email, password, industry, role_id)
+        SELECT %s, %s, %s, %s, %s, id FROM roles WHERE name = 'Admin'
+        ON CONFLICT (username) DO NOTHING
+        ''',
+        ("Super Admin", "admin", "admin@example.com", db._hash_password("admin123"), "Administration")
+    )
+
+
+@migration(3, "Add indexes for listings, case-insensitive lookups and uniqueness")
+def _create_access_indexes(cur, db):
+    # Listings filter on role and page newest first; id breaks ties between equal
+    # timestamps so every keyset page boundary is unique, and INCLUDE keeps them index-only.
+    cur.execute('''
+        CREATE INDEX IF NOT EXISTS users_role_registered_at_id_idx
+        ON users (role_id, registered_at DESC, id DESC)
+        INCLUDE (full_name, username, email, industry)
+    ''')
+    # Login and availability checks match lower(username) / lower(email), so accounts
+    # differing only by case would be ambiguous; list them instead of failing on an
+    # opaque unique index error.
+    for column in ("username", "email"):
+        cur.execute(f'''
+            SELECT lower({column}) FROM users
+            WHERE {column} IS NOT NULL
+            GROUP BY 1 HAVING count(*) > 1
+            ORDER BY 1 LIMIT 10
+        ''')
+        duplicates = [row[0] for row in cur.fetchall()]
+        if duplicates:
+            raise ValueError(
+                f"Accounts share a {column} that differs only by case ({', '.join(duplicates)}); "
+                f"rename them before upgrading."
+            )
+    cur.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS users_lower_username_key
+        ON users (lower(username)) INCLUDE (username)
+    ''')
+    cur.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS users_lower_email_key
+        ON users (lower(email)) INCLUDE (email)
+    ''')
+    cur.execute('ANALYZE users')
+
+
+@migration(4, "Create sessions table for persistent logins")
+def _create_sessions(cur, db):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL
+        );
+    ''')
+    cur.execute('CREATE INDEX IF NOT EXISTS sessions_expires_at_idx ON sessions (expires_at)')
+    cur.execute('CREATE INDEX IF NOT EXISTS sessions_user_id_idx ON sessions (user_id)')
+
+
+# Lower-cased text matched by admin account search; queries must repeat it verbatim
+# for Postgres to use the trigram index below.
+SEARCH_TEXT = (
+    "lower(coalesce(full_name, '') || ' ' || coalesce(username, '') || ' ' || "
+    "coalesce(email, '') || ' ' || coalesce(industry, ''))"
+)
+
+
+@migration(5, "Add trigram index for admin account search")
+def _create_search_index(cur, db):
+    try:
+        cur.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except psycopg2.Error as e:
+        # Search still works without the index, only by sequential scans.
+        raise MigrationPending(
+            f"pg_trgm is not available ({e.diag.message_primary or e}); account search scans every row until it is installed."
+        ) from e
+    cur.execute(f'CREATE INDEX IF NOT EXISTS users_search_trgm_idx ON users USING gin (({SEARCH_TEXT}) gin_trgm_ops)')
+
+
+# Registrations per role, industry and day as computed from the base table; the
+# rollup table maintained by the triggers below must always match it. Accounts
+# without an industry are counted under ''.
+ROLLUP_SOURCE_SQL = '''
+    SELECT role_id, coalesce(industry, '') AS industry, registered_at::date AS day, count(*) AS registrations
+    FROM users
+    WHERE role_id IS NOT NULL AND registered_at IS NOT NULL
+    GROUP BY 1, 2, 3
+'''
+
+
+@migration(6, "Create trigger-maintained registration rollup")
+def _create_registration_rollup(cur, db):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS registration_rollup (
+            role_id INTEGER NOT NULL,
+            industry TEXT NOT NULL,
+            day DATE NOT NULL,
+            registrations BIGINT NOT NULL,
+            PRIMARY KEY (role_id, day, industry)
+        );
+    ''')
+    # Statement-level triggers see every changed row at once through transition
+    # tables, so a bulk import or batch update touches each rollup row only once.
+    cur.execute('''
+        CREATE OR REPLACE FUNCTION registration_rollup_apply() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO registration_rollup AS r (role_id, industry, day, registrations)
+                SELECT role_id, coalesce(industry, ''), registered_at::date, count(*)
+                FROM new_rows
+                WHERE role_id IS NOT NULL AND registered_at IS NOT NULL
+                GROUP BY 1, 2, 3
+                ORDER BY 1, 3, 2
+                ON CONFLICT (role_id, day, industry)
+                DO UPDATE SET registrations = r.registrations + EXCLUDED.registrations;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO registration_rollup AS r (role_id, industry, day, registrations)
+                SELECT role_id, coalesce(industry, ''), registered_at::date, -count(*)
+                FROM old_rows
+                WHERE role_id IS NOT NULL AND registered_at IS NOT NULL
+                GROUP BY 1, 2, 3
+                ORDER BY 1, 3, 2
+                ON CONFLICT (role_id, day, industry)
+                DO UPDATE SET registrations = r.registrations + EXCLUDED.registrations;
+            ELSE
+                -- Only rows whose role, industry or registration day changed move between buckets.
+                INSERT INTO registration_rollup AS r (role_id, industry, day, registrations)
+                SELECT role_id, industry, day, sum(delta)
+                FROM (
+                    SELECT o.role_id, coalesce(o.industry, '') AS industry, o.registered_at::date AS day, -1 AS delta
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE (o.role_id, o.industry, o.registered_at::date)
+                          IS DISTINCT FROM (n.role_id, n.industry, n.registered_at::date)
+                    UNION ALL
+                    SELECT n.role_id, coalesce(n.industry, ''), n.registered_at::date, 1
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE (o.role_id, o.industry, o.registered_at::date)
+                          IS DISTINCT FROM (n.role_id, n.industry, n.registered_at::date)
+                ) AS changes
+                WHERE role_id IS NOT NULL AND day IS NOT NULL
+                GROUP BY 1, 2, 3
+                HAVING sum(delta) <> 0
+                ORDER BY 1, 3, 2
+                ON CONFLICT (role_id, day, industry)
+                DO UPDATE SET registrations = r.registrations + EXCLUDED.registrations;
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+    ''')
+    cur.execute('''
+        DROP TRIGGER IF EXISTS users_registration_rollup_insert ON users;
+        CREATE TRIGGER users_registration_rollup_insert
+            AFTER INSERT ON users REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_apply();
+        DROP TRIGGER IF EXISTS users_registration_rollup_update ON users;
+        CREATE TRIGGER users_registration_rollup_update
+            AFTER UPDATE ON users REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_apply();
+        DROP TRIGGER IF EXISTS users_registration_rollup_delete ON users;
+        CREATE TRIGGER users_registration_rollup_delete
+            AFTER DELETE ON users REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION registration_rollup_apply();
+    ''')
+    # Backfill under a lock that blocks concurrent writes, so no change is counted twice or missed.
+    cur.execute('LOCK TABLE users IN SHARE ROW EXCLUSIVE MODE')
+    cur.execute('DELETE FROM registration_rollup')
+    cur.execute(f'INSERT INTO registration_rollup (role_id, industry, day, registrations) {ROLLUP_SOURCE_SQL}')
+
+
+class MigrationRunner:
+    def __init__(self, db):
+        self.db = db
+
+    def run(self):
+        """Apply pending migrations and return the versions that were applied."""
+        applied_now = []
+        with self.db.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute('SELECT pg_advisory_xact_lock(%s)', (MIGRATION_LOCK_KEY,))
+                cur.execute('''
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT NOT NULL,
+                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                ''')
+                cur.execute('SELECT version FROM schema_version')
+                applied = {row[0] for row in cur.fetchall()}
+
+                for version, description, apply in MIGRATIONS:
+                    if version in applied:
+                        continue
+                    cur.execute('SAVEPOINT migration')
+                    try:
+                        apply(cur, self.db)
+                    except MigrationPending as e:
+                        cur.execute('ROLLBACK TO SAVEPOINT migration')
+                        logger.warning("Migration %s (%s) postponed: %s", version, description, e)
+                        continue
+                    cur.execute('RELEASE SAVEPOINT migration')
+                    cur.execute(
+                        'INSERT INTO schema_version (version, description) VALUES (%s, %s)',
+                        (version, description)
+                    )
+                    applied_now.append(version)
+            conn.commit()
+        return applied_now
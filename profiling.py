@@ -0,0 +1,142 @@
+import cProfile
+import csv
+import itertools
+import os
+import pstats
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+
+# Each profiled rerun is dumped as a .prof file (pstats format, loadable by snakeviz,
+# tuna or flameprof for flame graphs); only the newest PROFILE_KEEP files are kept.
+PROFILE_DIR = os.environ.get("HIREZY_PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("HIREZY_PROFILE_KEEP", 50))
+
+_enabled = os.environ.get("HIREZY_PROFILE", "").lower() in ("1", "true", "yes", "on")
+_tags = ContextVar("profile_tags", default=None)
+_reruns = deque(maxlen=PROFILE_KEEP)
+_lock = threading.Lock()
+_sequence = itertools.count(1)
+
+
+def is_enabled():
+    """True when reruns are being profiled."""
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Turn rerun profiling on or off for the whole process (the admin toggle)."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def tag(**tags):
+    """Attach tags such as role and page to the rerun being profiled; a no-op otherwise."""
+    current = _tags.get()
+    if current is not None:
+        current.update(tags)
+
+
+def _outcome(error):
+    # st.rerun() and st.stop() end a script run by raising; neither is a failure.
+    if error is None:
+        return "ok"
+    return {"RerunException": "rerun", "StopException": "stop"}.get(type(error).__name__, "error")
+
+
+def _slug(value):
+    return re.sub(r"[^A-Za-z0-9]+", "-", str(value)).strip("-").lower() or "none"
+
+
+def _top_function(stats):
+    """The function with the most time spent in its own body, as file:line(name)."""
+    if not stats.stats:
+        return None
+    (filename, line, name), _ = max(stats.stats.items(), key=lambda item: item[1][2])
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+@contextmanager
+def profile_rerun():
+    """Profile the enclosed script run when profiling is enabled, then dump and summarize it."""
+    if not _enabled:
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active on this interpreter (Python 3.12+ allows only one).
+        yield
+        return
+
+    tags = {"role": None, "page": None}
+    token = _tags.set(tags)
+    started_at = datetime.now()
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        _tags.reset(token)
+        _record(profiler, tags, started_at, elapsed, _outcome(error))
+
+
+def _record(profiler, tags, started_at, elapsed, outcome):
+    stats = pstats.Stats(profiler)
+    name = (
+        f"{started_at:%Y%m%d-%H%M%S}-{next(_sequence):06d}"
+        f"-{_slug(tags['role'])}-{_slug(tags['page'])}.prof"
+    )
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stats.dump_stats(os.path.join(PROFILE_DIR, name))
+    rerun = {
+        "file": name,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "role": tags["role"],
+        "page": tags["page"],
+        "outcome": outcome,
+        "calls": stats.total_calls,
+        "top_function": _top_function(stats),
+    }
+    with _lock:
+        _reruns.append(rerun)
+        _prune()
+        _write_summary()
+
+
+def _prune():
+    files = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".prof"))
+    for name in files[:-PROFILE_KEEP]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            pass
+
+
+def _write_summary():
+    path = os.path.join(PROFILE_DIR, "summary.csv")
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(_reruns[0]))
+        writer.writeheader()
+        writer.writerows(sorted(_reruns, key=lambda rerun: rerun["elapsed_ms"], reverse=True))
+
+
+def slowest(limit=20):
+    """The slowest of the recently profiled reruns, slowest first."""
+    with _lock:
+        reruns = list(_reruns)
+    return sorted(reruns, key=lambda rerun: rerun["elapsed_ms"], reverse=True)[:limit]
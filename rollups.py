@@ -0,0 +1,70 @@
+"""Rebuild or verify the registration rollup maintained by the users triggers.
+
+Run from the repository root:
+
+    python -m rollups check      # report buckets that differ from the users table
+    python -m rollups rebuild    # recompute the rollup from the users table
+
+The database comes from HIREZY_DATABASE_URL.
+"""
+import argparse
+import os
+import sys
+
+from db import Database
+from migrations import ROLLUP_SOURCE_SQL
+
+
+def rebuild(db):
+    """Recompute the whole rollup from users and return the number of buckets written.
+
+    Writes to users wait for the rebuild, so it stays exact while the app is running.
+    """
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute('LOCK TABLE users IN SHARE ROW EXCLUSIVE MODE')
+            cur.execute('DELETE FROM registration_rollup')
+            cur.execute(f'INSERT INTO registration_rollup (role_id, industry, day, registrations) {ROLLUP_SOURCE_SQL}')
+            written = cur.rowcount
+            conn.commit()
+    return written
+
+
+def check(db):
+    """Compare the rollup with users and return (role_id, industry, day, expected, actual) for every mismatch."""
+    with db.connect(readonly=True) as conn:
+        with conn.cursor() as cur:
+            # A repeatable-read snapshot keeps both sides of the comparison at the same point in time.
+            cur.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+            cur.execute(f'''
+                SELECT coalesce(s.role_id, r.role_id), coalesce(s.industry, r.industry), coalesce(s.day, r.day),
+                       coalesce(s.registrations, 0), coalesce(r.registrations, 0)
+                FROM ({ROLLUP_SOURCE_SQL}) AS s
+                FULL JOIN registration_rollup r
+                    ON r.role_id = s.role_id AND r.industry = s.industry AND r.day = s.day
+                WHERE coalesce(s.registrations, 0) <> coalesce(r.registrations, 0)
+                ORDER BY 1, 3, 2
+            ''')
+            return cur.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["check", "rebuild"])
+    args = parser.parse_args()
+
+    db = Database(dsn=os.environ.get("HIREZY_DATABASE_URL"))
+    db.initialize()
+    if args.command == "rebuild":
+        print(f"Rebuilt registration rollup: {rebuild(db)} buckets.")
+        return
+
+    mismatches = check(db)
+    for role_id, industry, day, expected, actual in mismatches:
+        print(f"role {role_id} industry {industry or '-'} {day}: users has {expected}, rollup has {actual}")
+    print(f"{len(mismatches)} mismatched buckets.")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
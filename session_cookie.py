@@ -0,0 +1,50 @@
+import json
+
+import streamlit as st
+
+
+# The signed session token lives in this cookie, so a refresh or a new tab resumes the
+# login. Streamlit cannot set response headers, so the cookie is written by a script
+# and is readable by page JavaScript; it holds no more than SessionStore tokens do.
+COOKIE_NAME = "hirezy_session"
+
+# The token the browser holds as far as this Streamlit session knows; it outlives logout.
+_BROWSER_TOKEN = "session_cookie"
+
+
+def restore(auth_service):
+    """Resume the login of the session token sent with the page request; return the user dict or None."""
+    token = st.context.cookies.get(COOKIE_NAME)
+    st.session_state[_BROWSER_TOKEN] = token
+    user = auth_service.resolve_session(token) if token else None
+    if user:
+        st.session_state["logged_in"] = True
+        st.session_state["user"] = user
+        st.session_state["session_token"] = token
+    return user
+
+
+def sync(token, max_age):
+    """Make the browser cookie hold `token`, or delete it for None; a no-op when it already does."""
+    if st.session_state.get(_BROWSER_TOKEN) == token:
+        return
+    attributes = f"; Path=/; SameSite=Strict; Max-Age={int(max_age) if token else 0}"
+    st.html(
+        f"""
+        <script>
+        document.cookie = {json.dumps(f"{COOKIE_NAME}={token or ''}{attributes}")}
+            + (location.protocol === "https:" ? "; Secure" : "");
+        </script>
+        """,
+        unsafe_allow_javascript=True,
+    )
+    st.session_state[_BROWSER_TOKEN] = token
+
+
+def logout(auth_service):
+    """Revoke the session and forget the login; the next run deletes the cookie."""
+    auth_service.revoke_session(st.session_state.get("session_token"))
+    browser_token = st.session_state.get(_BROWSER_TOKEN)
+    st.session_state.clear()
+    st.session_state["logged_in"] = False
+    st.session_state[_BROWSER_TOKEN] = browser_token
@@ -0,0 +1,157 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from datetime import timedelta
+
+from cache import TTLCache
+from db import register_statement
+
+
+RESOLVE_SESSION = register_statement("session_resolve", '''
+    SELECT users.id, users.full_name, users.username, users.email, users.role_id,
+           EXTRACT(EPOCH FROM sessions.expires_at - CURRENT_TIMESTAMP)
+    FROM sessions
+    INNER JOIN users ON users.id = sessions.user_id
+    WHERE sessions.id = %s AND sessions.expires_at > CURRENT_TIMESTAMP
+''')
+
+# Resolved sessions shared by every Streamlit session of the process. Entries live
+# at most `CACHE_TTL` seconds so revocations made by other processes are seen soon.
+CACHE_TTL = 60.0
+_cache = TTLCache(max_entries=10_000, ttl=CACHE_TTL)
+
+_secret = os.environ.get("HIREZY_SESSION_SECRET", "").encode() or secrets.token_bytes(32)
+_last_purge = 0.0
+_purge_lock = threading.Lock()
+
+
+def _sign(session_id):
+    return hmac.new(_secret, session_id.encode(), hashlib.sha256).hexdigest()
+
+
+def _storage_key(session_id):
+    """Only a hash of the session id is stored, so a database leak exposes no usable tokens."""
+    return hashlib.sha256(session_id.encode()).hexdigest()
+
+
+class SessionStore:
+    """Signed, expiring login sessions persisted in the sessions table with an in-process cache in front.
+
+    Tokens are "<session id>.<HMAC signature>". Set HIREZY_SESSION_SECRET so
+    tokens stay valid across restarts and app replicas; without it a random
+    per-process secret is used.
+    """
+
+    def __init__(self, db, lifetime=timedelta(days=7), purge_interval=3600.0):
+        self.db = db
+        self.lifetime = lifetime
+        self.purge_interval = purge_interval
+
+    @staticmethod
+    def _parse(token):
+        """Return the session id of a correctly signed token, else None."""
+        session_id, _, signature = (token or "").partition(".")
+        if not session_id or not hmac.compare_digest(_sign(session_id), signature):
+            return None
+        return session_id
+
+    def create(self, user):
+        """Persist a session for a logged-in user dict and return its token."""
+        session_id = secrets.token_urlsafe(32)
+        with self.db.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    'INSERT INTO sessions (id, user_id, expires_at) VALUES (%s, %s, CURRENT_TIMESTAMP + %s)',
+                    (_storage_key(session_id), user["id"], self.lifetime)
+                )
+                conn.commit()
+        _cache.set(session_id, dict(user), ttl=min(CACHE_TTL, self.lifetime.total_seconds()))
+        self._maybe_purge()
+        return f"{session_id}.{_sign(session_id)}"
+
+    def resolve(self, token):
+        """Return the user dict of a valid, unexpired session token, or None."""
+        session_id = self._parse(token)
+        if session_id is None:
+            return None
+        cached = _cache.get(session_id)
+        if cached is not None:
+            return dict(cached)
+
+        with self.db.connect() as conn:
+            with conn.cursor() as cur:
+                self.db.execute(cur, RESOLVE_SESSION, (_storage_key(session_id),))
+                row = cur.fetchone()
+        if row is None:
+            return None
+        user_id, full_name, username, email, role_id, expires_in = row
+        user = {
+            "id": user_id,
+            "name": full_name,
+            "username": username,
+            "email": email,
+            "role": self.db.role_name(role_id),
+        }
+        _cache.set(session_id, user, ttl=min(CACHE_TTL, float(expires_in)))
+        return dict(user)
+
+    def revoke(self, token):
+        """Delete a session so its token no longer resolves."""
+        session_id = self._parse(token)
+        if session_id is None:
+            return
+        _cache.pop(session_id)
+        with self.db.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute('DELETE FROM sessions WHERE id = %s', (_storage_key(session_id),))
+                conn.commit()
+
+    @staticmethod
+    def forget_user(user_id):
+        """Drop cached sessions of a user whose details changed; they reload on next use."""
+        return _cache.discard_if(lambda _, user: user["id"] == user_id)
+
+    @staticmethod
+    def forget_users(user_ids):
+        """Drop cached sessions of many users in a single pass over the cache."""
+        user_ids = set(user_ids)
+        return _cache.discard_if(lambda _, user: user["id"] in user_ids)
+
+    def purge_expired(self, batch_size=10_000):
+        """Delete expired sessions in batches and return how many were removed."""
+        removed = 0
+        while True:
+            with self.db.connect() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        '''
+                        DELETE FROM sessions WHERE id IN (
+                            SELECT id FROM sessions WHERE expires_at <= CURRENT_TIMESTAMP LIMIT %s
+                        )
+                        ''',
+                        (batch_size,)
+                    )
+                    deleted = cur.rowcount
+                    conn.commit()
+            removed += deleted
+            if deleted < batch_size:
+                return removed
+
+    def _maybe_purge(self):
+        global _last_purge
+        now = time.monotonic()
+        if now - _last_purge < self.purge_interval or not _purge_lock.acquire(blocking=False):
+            return
+        try:
+            _last_purge = now
+            self.purge_expired()
+        finally:
+            _purge_lock.release()
+
+    @staticmethod
+    def cache_stats():
+        """Return hit/miss counters of the resolved-session cache."""
+        return _cache.stats()
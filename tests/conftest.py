@@ -0,0 +1,62 @@
+import os
+import sys
+import uuid
+
+import psycopg2
+import pytest
+from psycopg2.extras import execute_values
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import AuthService  # noqa: E402
+from db import Database  # noqa: E402
+from throttle import LoginThrottle  # noqa: E402
+
+
+# Database tests run against HIREZY_TEST_DATABASE_URL, which must point at a database
+# the tests may migrate and write to; they are skipped when it is not set.
+TEST_DATABASE_URL = os.environ.get("HIREZY_TEST_DATABASE_URL")
+
+
+@pytest.fixture(scope="session")
+def db():
+    if not TEST_DATABASE_URL:
+        pytest.skip("HIREZY_TEST_DATABASE_URL is not set")
+    database = Database(dsn=TEST_DATABASE_URL, pooled=True)
+    try:
+        database.initialize()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"test database unavailable: {e}")
+    return database
+
+
+@pytest.fixture
+def prefix(db):
+    """Unique username prefix for the accounts a test creates; they are deleted afterwards."""
+    value = f"test_{uuid.uuid4().hex[:8]}_"
+    yield value
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM users WHERE username LIKE %s", (value.replace("_", "\\_") + "%",))
+            conn.commit()
+
+
+@pytest.fixture
+def service(db):
+    return AuthService(db, throttle=LoginThrottle())
+
+
+@pytest.fixture
+def make_accounts(db, prefix):
+    """Insert accounts directly: make_accounts([(username, email, full_name, registered_at), ...], role)."""
+    def insert(accounts, role="User", password=None):
+        role_id = db.role_id(role)
+        industry = "Software" if role == "User" else None
+        with db.connect() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, '''
+                    INSERT INTO users (username, email, full_name, registered_at, password, industry, role_id)
+                    VALUES %s
+                ''', [(*account, password, industry, role_id) for account in accounts])
+                conn.commit()
+    return insert
@@ -0,0 +1,43 @@
+import io
+from datetime import datetime
+
+import pyarrow.parquet as pq
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from auth import USER_ACCOUNT_COLUMNS
+from export import export_bytes, export_csv, export_parquet
+
+
+ROWS = [
+    (1, "Ada Lovelace", "ada", "ada@example.com", "Software", datetime(2024, 1, 2, 3, 4, 5)),
+    (2, "Alan Turing", "alan", "alan@example.com", None, datetime(2023, 6, 7, 8, 9, 10)),
+]
+
+
+@pytest.mark.parametrize("file_format", ["CSV", "Parquet"])
+def test_export_bytes_is_accepted_by_download_button(file_format):
+    data = export_bytes(iter(ROWS), USER_ACCOUNT_COLUMNS, file_format)
+    converted, _ = convert_data_to_bytes_and_infer_mime(data, unsupported_error=TypeError("unsupported type"))
+    assert converted == data
+
+
+def test_export_csv_writes_header_and_rows():
+    text = export_csv(iter(ROWS), USER_ACCOUNT_COLUMNS).getvalue().decode()
+    lines = text.splitlines()
+    assert lines[0] == ",".join(USER_ACCOUNT_COLUMNS)
+    assert lines[2] == "2,Alan Turing,alan,alan@example.com,,2023-06-07 08:09:10"
+
+
+def test_export_parquet_batches_into_row_groups():
+    rows = ROWS * 5
+    table_file = pq.ParquetFile(io.BytesIO(export_parquet(iter(rows), USER_ACCOUNT_COLUMNS, row_group_size=3).getvalue()))
+    assert table_file.metadata.num_rows == len(rows)
+    assert table_file.num_row_groups == 4
+    assert table_file.schema_arrow.names == list(USER_ACCOUNT_COLUMNS)
+
+
+def test_export_parquet_types_a_column_first_seen_as_nulls():
+    rows = [row[:4] + (None,) + row[5:] for row in ROWS] + list(ROWS)
+    table = pq.read_table(io.BytesIO(export_parquet(iter(rows), USER_ACCOUNT_COLUMNS, row_group_size=2).getvalue()))
+    assert table.column("industry").to_pylist() == [None, None, "Software", None]
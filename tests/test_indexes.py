@@ -0,0 +1,50 @@
+import pytest
+from psycopg2.extensions import make_dsn
+
+from auth import ALL_USER_ACCOUNTS, EMAIL_EXISTS, LOGIN, USER_ACCOUNTS_PAGE, USERNAME_EXISTS
+from conftest import TEST_DATABASE_URL
+from db import Database
+
+
+def test_usernames_differing_only_by_case_are_rejected(service, prefix):
+    service.register_user("Case One", f"{prefix}Case", f"{prefix}one@example.com", "Corr3ct#Horse", "Software")
+    with pytest.raises(ValueError, match="username is already taken"):
+        service.register_user("Case Two", f"{prefix}CASE", f"{prefix}two@example.com", "Corr3ct#Horse", "Software")
+
+
+def test_emails_differing_only_by_case_are_rejected(service, prefix):
+    service.register_user("Case One", f"{prefix}one", f"{prefix}Mail@example.com", "Corr3ct#Horse", "Software")
+    with pytest.raises(ValueError, match="email is already registered"):
+        service.register_user("Case Two", f"{prefix}two", f"{prefix}MAIL@Example.com", "Corr3ct#Horse", "Software")
+
+
+@pytest.fixture(scope="module")
+def planner(db):
+    # The test table is tiny, where a sequential scan is always cheapest; with it
+    # disabled the plans show which index a query can use at production sizes.
+    return Database(dsn=make_dsn(TEST_DATABASE_URL, options="-c enable_seqscan=off"))
+
+
+@pytest.mark.parametrize("statement, index", [
+    (USERNAME_EXISTS, "users_lower_username_key"),
+    (EMAIL_EXISTS, "users_lower_email_key"),
+])
+def test_existence_checks_are_index_only(planner, statement, index):
+    assert planner.scans(statement, ("someone",)) == [("Index Only Scan", index)]
+
+
+def test_login_uses_both_lookup_indexes(planner):
+    assert sorted(planner.scans(LOGIN, ("someone", "someone"))) == [
+        ("Bitmap Heap Scan", "users"),
+        ("Bitmap Index Scan", "users_lower_email_key"),
+        ("Bitmap Index Scan", "users_lower_username_key"),
+    ]
+
+
+@pytest.mark.parametrize("statement, params", [
+    (ALL_USER_ACCOUNTS, ()),
+    (USER_ACCOUNTS_PAGE, ("2024-01-01", 1, 50)),
+])
+def test_listings_are_index_only(db, planner, statement, params):
+    params = (db.role_id("User"), *params)
+    assert planner.scans(statement, params) == [("Index Only Scan", "users_role_registered_at_id_idx")]
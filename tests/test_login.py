@@ -0,0 +1,35 @@
+import statistics
+import time
+
+import hashing
+from throttle import LoginThrottle
+
+
+def test_unknown_identifier_still_runs_the_kdf(service, monkeypatch):
+    verified = []
+    real_verify = hashing.verify_password
+    monkeypatch.setattr(hashing, "verify_password", lambda password, encoded: verified.append(encoded) or real_verify(password, encoded))
+
+    assert service.authenticate_user("no_such_account_anywhere", "Whatever#123") is None
+    assert verified == [hashing.dummy_hash()]
+
+
+def test_unknown_and_existing_identifiers_take_comparable_time(service, prefix):
+    password = "Corr3ct#Horse"
+    service.register_user("Timing Test", f"{prefix}timing", f"{prefix}timing@example.com", password, "Software")
+    hashing.dummy_hash()
+    service.authenticate_user(f"{prefix}timing", password)
+
+    def median_login_seconds(identifier):
+        samples = []
+        for _ in range(5):
+            # Fresh buckets, so the failures do not trip the back-off.
+            service.throttle = LoginThrottle()
+            started = time.perf_counter()
+            service.authenticate_user(identifier, "Wrong#Passw0rd")
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples)
+
+    existing = median_login_seconds(f"{prefix}timing")
+    unknown = median_login_seconds(f"{prefix}missing")
+    assert unknown > existing * 0.5
@@ -0,0 +1,49 @@
+import metrics
+from async_db import AsyncDatabase, run_concurrently
+from auth import STATS_DAILY
+
+
+def test_generator_steps_are_tagged(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    seen = []
+
+    def rows():
+        try:
+            for i in range(3):
+                seen.append(metrics.current_operation())
+                yield i
+        finally:
+            seen.append(metrics.current_operation())
+
+    steps = metrics.tagged_steps(rows(), "AuthService.iter_user_accounts")
+    assert next(steps) == 0
+    # Between steps the caller's own queries keep their tag.
+    assert metrics.current_operation() == "-"
+    assert next(steps) == 1
+    steps.close()
+
+    assert seen == ["AuthService.iter_user_accounts"] * 3
+
+
+def test_outermost_operation_wins(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    with metrics.tagged_operation("AuthService.export"):
+        assert list(metrics.tagged_steps((i for i in range(2)), "AuthService.iter_hr_accounts")) == [0, 1]
+        assert metrics.current_operation() == "AuthService.export"
+
+
+def test_async_queries_are_timed_and_tagged_with_the_caller(db, monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    metrics.reset()
+    try:
+        with metrics.tagged_operation("AuthService.registration_statistics"):
+            run_concurrently(AsyncDatabase(db).fetchall(STATS_DAILY, (db.role_id("User"),), readonly=False))
+        snapshot = metrics.snapshot()
+    finally:
+        metrics.reset()
+
+    queries = {(query["operation"], query["statement"]): query for query in snapshot["queries"]}
+    assert queries[("AuthService.registration_statistics", STATS_DAILY)]["calls"] == 1
+    assert [(acquire["operation"], acquire["target"]) for acquire in snapshot["acquires"]] == [
+        ("AuthService.registration_statistics", "async-primary")
+    ]
@@ -0,0 +1,44 @@
+import migrations
+from migrations import MigrationPending, MigrationRunner
+
+
+PENDING_VERSION = 10_000
+
+
+def recorded(db):
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM schema_version WHERE version = %s", (PENDING_VERSION,))
+            return cur.fetchone() is not None
+
+
+def test_pending_migration_is_rolled_back_and_retried(db, monkeypatch):
+    server_ready = False
+
+    def create_table(cur, db):
+        cur.execute("CREATE TABLE pending_migration_probe (id INTEGER)")
+        if not server_ready:
+            raise MigrationPending("the extension is not installed")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [(PENDING_VERSION, "Pending probe", create_table)])
+    try:
+        assert MigrationRunner(db).run() == []
+        assert not recorded(db)
+
+        server_ready = True
+        assert MigrationRunner(db).run() == [PENDING_VERSION]
+        assert recorded(db)
+    finally:
+        with db.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DROP TABLE IF EXISTS pending_migration_probe")
+                cur.execute("DELETE FROM schema_version WHERE version = %s", (PENDING_VERSION,))
+                conn.commit()
+
+
+def test_search_index_is_reported(service):
+    with service.db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'users_search_trgm_idx'")
+            exists = cur.fetchone() is not None
+    assert service.search_is_indexed() == exists
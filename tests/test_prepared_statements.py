@@ -0,0 +1,72 @@
+from async_db import AsyncDatabase, _wait, run_concurrently
+from db import Database, register_statement
+
+
+ADD_ONE = register_statement("test_add_one", "SELECT %s::integer + 1")
+
+
+def server_statements(cur):
+    cur.execute("SELECT name FROM pg_prepared_statements")
+    return {name for name, in cur.fetchall()}
+
+
+def test_deallocated_statement_is_prepared_again_and_tracked(db):
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            assert Database.execute(cur, ADD_ONE, (1,)).fetchone() == (2,)
+            conn.commit()
+            cur.execute(f"DEALLOCATE {ADD_ONE}")
+            conn.commit()
+
+            assert Database.execute(cur, ADD_ONE, (2,)).fetchone() == (3,)
+            assert ADD_ONE in conn.prepared
+            assert ADD_ONE in server_statements(cur)
+
+
+def test_untracked_server_statement_is_adopted_instead_of_falling_back(db):
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            Database.execute(cur, ADD_ONE, (1,))
+            conn.commit()
+            conn.prepared.discard(ADD_ONE)
+
+            assert Database.execute(cur, ADD_ONE, (5,)).fetchone() == (6,)
+            assert ADD_ONE in conn.prepared
+            conn.commit()
+            # Tracked again, so the next call goes straight to EXECUTE.
+            cur.execute("SELECT count(*) FROM pg_prepared_statements WHERE name = %s", (ADD_ONE,))
+            assert cur.fetchone() == (1,)
+            assert Database.execute(cur, ADD_ONE, (6,)).fetchone() == (7,)
+
+
+def test_recovery_inside_a_transaction_keeps_earlier_work(db):
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            Database.execute(cur, ADD_ONE, (1,))
+            conn.commit()
+            cur.execute("CREATE TEMPORARY TABLE prepared_probe (x integer)")
+            cur.execute("INSERT INTO prepared_probe VALUES (1)")
+            cur.execute(f"DEALLOCATE {ADD_ONE}")
+
+            assert Database.execute(cur, ADD_ONE, (1,)).fetchone() == (2,)
+            cur.execute("SELECT count(*) FROM prepared_probe")
+            assert cur.fetchone() == (1,)
+            conn.rollback()
+
+
+def test_async_connection_recovers_deallocated_statement(db):
+    async_db = AsyncDatabase(db)
+    assert run_concurrently(async_db.fetchone(ADD_ONE, (1,), readonly=False))[0] == (2,)
+
+    async def on_pooled_connection(query):
+        async with async_db.pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query)
+            await _wait(conn)
+            return ADD_ONE in conn.prepared, cur.fetchall() if cur.description else None
+
+    tracked, _ = run_concurrently(on_pooled_connection("DEALLOCATE ALL"))[0]
+    assert tracked
+    assert run_concurrently(async_db.fetchone(ADD_ONE, (2,), readonly=False))[0] == (3,)
+    tracked, names = run_concurrently(on_pooled_connection("SELECT name FROM pg_prepared_statements"))[0]
+    assert tracked and (ADD_ONE,) in names
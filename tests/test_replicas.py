@@ -0,0 +1,60 @@
+import time
+import uuid
+
+import pytest
+from psycopg2.extensions import make_dsn
+
+import db as db_module
+from conftest import TEST_DATABASE_URL
+from db import Database, register_statement
+
+
+# Run on a replica, the statement ends its own backend mid-query, as if the replica died.
+REPLICA_PROBE = register_statement("test_replica_probe", '''
+    SELECT CASE WHEN current_setting('application_name') LIKE 'hirezy-replica%%'
+                THEN pg_terminate_backend(pg_backend_pid()) END,
+           current_setting('application_name')
+''')
+
+
+@pytest.fixture
+def primary_dsn(db):
+    return make_dsn(TEST_DATABASE_URL, application_name="hirezy-primary")
+
+
+@pytest.fixture(params=[False, True], ids=["unpooled", "pooled"])
+def pooled(request):
+    return request.param
+
+
+def test_unreachable_replica_is_skipped_during_cooldown(primary_dsn, pooled, monkeypatch):
+    replica_dsn = make_dsn(TEST_DATABASE_URL, port=1, application_name=f"hirezy-replica-{uuid.uuid4().hex}")
+    database = Database(dsn=primary_dsn, replica_dsns=[replica_dsn], pooled=pooled)
+
+    assert database.fetchone(REPLICA_PROBE)[1] == "hirezy-primary"
+    assert database._pick_replica() is None
+
+    monkeypatch.setattr(db_module, "_replicas_down", {})
+    assert database._pick_replica() == replica_dsn
+
+
+def test_replica_connections_time_out(primary_dsn):
+    # A non-routable address: the connection attempt hangs until connect_timeout.
+    replica_dsn = make_dsn("postgresql://openpg@10.255.255.1/hrms_test", connect_timeout=1)
+    database = Database(dsn=primary_dsn, replica_dsns=[replica_dsn])
+    assert "connect_timeout=1" in database._connect_kwargs(replica_dsn)["dsn"]
+    assert database._connect_kwargs("postgresql://replica/hrms")["connect_timeout"] == db_module.REPLICA_CONNECT_TIMEOUT
+
+    started = time.monotonic()
+    assert database.fetchone(REPLICA_PROBE)[1] == "hirezy-primary"
+    assert time.monotonic() - started < 5
+
+
+def test_read_is_retried_on_the_primary_when_the_replica_dies_mid_query(primary_dsn, pooled):
+    replica_dsn = make_dsn(TEST_DATABASE_URL, application_name=f"hirezy-replica-{uuid.uuid4().hex}")
+    database = Database(dsn=primary_dsn, replica_dsns=[replica_dsn], pooled=pooled)
+
+    terminated, served_by = database.fetchone(REPLICA_PROBE)
+
+    assert (terminated, served_by) == (None, "hirezy-primary")
+    assert database._pick_replica() is None
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import rollups
+
+
+# Days no other test registers accounts on, so their buckets belong to this test alone.
+DAY_ONE = datetime(1990, 1, 1, 9)
+DAY_TWO = datetime(1990, 1, 2, 9)
+
+
+def buckets(db):
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT role_id, industry, day::text, registrations FROM registration_rollup
+                WHERE day BETWEEN '1990-01-01' AND '1990-01-02' AND registrations <> 0
+            ''')
+            return set(cur.fetchall())
+
+
+def ids_by_username(db, prefix):
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT username, id FROM users WHERE username LIKE %s", (prefix.replace("_", "\\_") + "%",))
+            return dict(cur.fetchall())
+
+
+def test_triggers_keep_the_rollup_exact(db, service, prefix, make_accounts):
+    user, hr = db.role_id("User"), db.role_id("HR")
+    assert rollups.check(db) == []
+
+    # Statement-level INSERT: one COPY-like batch, Users and an HR account without industry.
+    make_accounts([(f"{prefix}{i}", f"{prefix}{i}@example.com", "Rollup Test", DAY_ONE) for i in range(4)])
+    make_accounts([(f"{prefix}hr", f"{prefix}hr@example.com", "Rollup HR", DAY_ONE)], role="HR")
+    ids = ids_by_username(db, prefix)
+    assert buckets(db) == {(user, "Software", "1990-01-01", 4), (hr, "", "1990-01-01", 1)}
+
+    # Industry change moves one account; a password-only change moves nothing.
+    service.update_user(ids[f"{prefix}0"], "Rollup Test", f"{prefix}0@example.com", industry="Finance")
+    service.update_user(ids[f"{prefix}1"], "Rollup Test", f"{prefix}1@example.com", password="N3w#Password")
+    # Batch update: one row changes, one keeps its industry.
+    service.update_industries({ids[f"{prefix}2"]: "Healthcare", ids[f"{prefix}3"]: "Software"})
+    assert buckets(db) == {
+        (user, "Finance", "1990-01-01", 1),
+        (user, "Healthcare", "1990-01-01", 1),
+        (user, "Software", "1990-01-01", 2),
+        (hr, "", "1990-01-01", 1),
+    }
+
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            # NULL and '' share a bucket, so this change is netted out by HAVING sum(delta) <> 0.
+            cur.execute("UPDATE users SET industry = '' WHERE id = %s", (ids[f"{prefix}hr"],))
+            # A new registration day and a role change in one statement.
+            cur.execute(
+                "UPDATE users SET registered_at = %s, role_id = CASE WHEN id = %s THEN %s ELSE role_id END "
+                "WHERE id = ANY(%s)",
+                (DAY_TWO, ids[f"{prefix}3"], hr, [ids[f"{prefix}2"], ids[f"{prefix}3"]]),
+            )
+            conn.commit()
+    assert buckets(db) == {
+        (user, "Finance", "1990-01-01", 1),
+        (user, "Software", "1990-01-01", 1),
+        (user, "Healthcare", "1990-01-02", 1),
+        (hr, "", "1990-01-01", 1),
+        (hr, "Software", "1990-01-02", 1),
+    }
+
+    service.delete_user(ids[f"{prefix}0"])
+    service.delete_users([ids[f"{prefix}2"], ids[f"{prefix}hr"]])
+    assert buckets(db) == {(user, "Software", "1990-01-01", 1), (hr, "Software", "1990-01-02", 1)}
+    assert rollups.check(db) == []
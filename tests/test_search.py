@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+
+def test_search_ranks_exact_and_prefix_matches_above_many_newer_matches(service, prefix, make_accounts):
+    query = f"{prefix}target"
+    now = datetime(2025, 1, 1)
+    # Far more newer accounts merely containing the term than the old candidate limit of 1000,
+    # inserted first so a scan meets them before the better matches.
+    accounts = [
+        (f"{prefix}u{i}", f"x{i}{query}@example.com", "Broad Match", now - timedelta(minutes=i))
+        for i in range(1500)
+    ]
+    accounts += [
+        (f"{query}{i}", f"{prefix}p{i}@example.com", "Prefix Match", now - timedelta(days=300 + i))
+        for i in range(3)
+    ]
+    accounts.append((query, f"{prefix}exact@example.com", "Exact Match", now - timedelta(days=400)))
+    make_accounts(accounts)
+
+    results = service.search_accounts("User", query, limit=10)
+
+    usernames = [row[2] for row in results]
+    assert usernames[0] == query
+    assert usernames[1:4] == [f"{query}0", f"{query}1", f"{query}2"]
+    assert usernames[4:] == [f"{prefix}u{i}" for i in range(6)]
+
+
+def test_search_is_case_insensitive_for_exact_matches(service, prefix, make_accounts):
+    make_accounts([(f"{prefix}Mixed", f"{prefix}mixed@example.com", "Case Test", datetime(2020, 1, 1))])
+    assert [row[2] for row in service.search_accounts("User", f"{prefix}MIXED")] == [f"{prefix}Mixed"]
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+
+import session_cookie
+
+
+def login_session(service, prefix):
+    user_id = service.register_user("Session Test", f"{prefix}session", f"{prefix}session@example.com", "Corr3ct#Horse", "Software")
+    user = {"id": user_id, "name": "Session Test", "username": f"{prefix}session",
+            "email": f"{prefix}session@example.com", "role": "User"}
+    return user_id, service.create_session(user)
+
+
+def test_password_change_revokes_sessions(service, prefix):
+    user_id, token = login_session(service, prefix)
+    assert service.resolve_session(token)["id"] == user_id
+
+    service.update_user(user_id, "Session Test", f"{prefix}session@example.com", password="N3w#Password")
+
+    assert service.resolve_session(token) is None
+    with service.db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM sessions WHERE user_id = %s", (user_id,))
+            assert cur.fetchone()[0] == 0
+
+
+def test_profile_change_keeps_sessions(service, prefix):
+    user_id, token = login_session(service, prefix)
+
+    service.update_user(user_id, "Renamed", f"{prefix}session@example.com")
+
+    assert service.resolve_session(token)["name"] == "Renamed"
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    """Stand-in for the Streamlit API session_cookie uses: request cookies, session_state and emitted scripts."""
+    fake = SimpleNamespace(context=SimpleNamespace(cookies={}), session_state={}, scripts=[])
+    fake.html = lambda body, **options: fake.scripts.append(body)
+    monkeypatch.setattr(session_cookie, "st", fake)
+    return fake
+
+
+def test_reload_resumes_the_login_from_the_cookie(service, prefix, browser):
+    user_id, token = login_session(service, prefix)
+    browser.context.cookies[session_cookie.COOKIE_NAME] = token
+
+    assert session_cookie.restore(service)["id"] == user_id
+    assert browser.session_state["logged_in"] and browser.session_state["session_token"] == token
+    session_cookie.sync(token, 60)
+    assert browser.scripts == []
+
+
+def test_login_sets_and_logout_deletes_the_cookie(service, prefix, browser):
+    user_id, token = login_session(service, prefix)
+    assert session_cookie.restore(service) is None
+
+    browser.session_state.update(logged_in=True, session_token=token)
+    session_cookie.sync(token, 60)
+    session_cookie.sync(token, 60)
+    assert len(browser.scripts) == 1 and token in browser.scripts[0] and "Max-Age=60" in browser.scripts[0]
+
+    session_cookie.logout(service)
+    session_cookie.sync(None, 60)
+    assert len(browser.scripts) == 2 and "Max-Age=0" in browser.scripts[1]
+    assert service.resolve_session(token) is None
+
+
+def test_cookie_of_a_revoked_session_is_not_resumed(service, prefix, browser):
+    user_id, token = login_session(service, prefix)
+    service.update_user(user_id, "Session Test", f"{prefix}session@example.com", password="N3w#Password")
+    browser.context.cookies[session_cookie.COOKIE_NAME] = token
+
+    assert session_cookie.restore(service) is None
+    assert "logged_in" not in browser.session_state
@@ -0,0 +1,16 @@
+import pytest
+
+from throttle import LoginThrottle, LoginThrottled, RateLimiter
+
+
+def test_empty_custom_limiters_are_kept():
+    # An empty RateLimiter is falsy through __len__; it must still be used.
+    identifier_limiter = RateLimiter(capacity=1)
+    client_limiter = RateLimiter(capacity=1)
+    throttle = LoginThrottle(identifier_limiter, client_limiter)
+
+    assert throttle.identifier_limiter is identifier_limiter
+    assert throttle.client_limiter is client_limiter
+    throttle.check("someone", "10.0.0.1")
+    with pytest.raises(LoginThrottled):
+        throttle.check("someone", "10.0.0.2")
@@ -0,0 +1,129 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class LoginThrottled(ValueError):
+    """Raised when a login attempt is rejected before reaching the database."""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Too many login attempts. Please try again in {math.ceil(retry_after)} seconds.")
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "failures", "blocked_until")
+
+    def __init__(self, capacity, now):
+        self.tokens = capacity
+        self.updated = now
+        self.failures = 0
+        self.blocked_until = 0.0
+
+
+class RateLimiter:
+    """Token buckets with exponential back-off on failures, kept in an LRU-bounded table.
+
+    Every operation is O(1); once `max_entries` keys are tracked the least
+    recently used bucket is evicted, so memory stays bounded under floods of
+    distinct identifiers.
+    """
+
+    def __init__(self, capacity=10, refill_per_second=1 / 60, max_entries=100_000,
+                 free_failures=3, backoff_base=1.0, backoff_max=900.0):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_entries = max_entries
+        self.free_failures = free_failures
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, key, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(self.capacity, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.refill_per_second)
+            bucket.updated = now
+        return bucket
+
+    def acquire(self, key, now=None):
+        """Take a token for `key`; return 0 when allowed, else seconds until retrying makes sense."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._bucket(key, now)
+            if bucket.blocked_until > now:
+                return bucket.blocked_until - now
+            if bucket.tokens < 1:
+                return (1 - bucket.tokens) / self.refill_per_second
+            bucket.tokens -= 1
+            return 0.0
+
+    def failure(self, key, now=None):
+        """Record a failed attempt, blocking the key with exponential back-off past the free failures."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._bucket(key, now)
+            bucket.failures += 1
+            excess = bucket.failures - self.free_failures
+            if excess > 0:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** min(excess - 1, 32))
+                bucket.blocked_until = now + delay
+
+    def success(self, key):
+        """Forget the key's failures after a successful attempt; spent tokens stay spent."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.failures = 0
+                bucket.blocked_until = 0.0
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class LoginThrottle:
+    """Throttles logins per identifier and per client before any database or hashing work."""
+
+    def __init__(self, identifier_limiter=None, client_limiter=None):
+        self.identifier_limiter = RateLimiter() if identifier_limiter is None else identifier_limiter
+        self.client_limiter = (
+            RateLimiter(capacity=30, refill_per_second=0.5, free_failures=10) if client_limiter is None else client_limiter
+        )
+
+    def _keys(self, identifier, client):
+        keys = [(self.identifier_limiter, (identifier or "").strip().lower())]
+        if client:
+            keys.append((self.client_limiter, client))
+        return keys
+
+    def check(self, identifier, client=None):
+        """Raise LoginThrottled if the identifier or client may not attempt a login right now."""
+        retry_after = max(limiter.acquire(key) for limiter, key in self._keys(identifier, client))
+        if retry_after > 0:
+            raise LoginThrottled(retry_after)
+
+    def failure(self, identifier, client=None):
+        """Record a failed login."""
+        for limiter, key in self._keys(identifier, client):
+            limiter.failure(key)
+
+    def success(self, identifier, client=None):
+        """Record a successful login."""
+        for limiter, key in self._keys(identifier, client):
+            limiter.success(key)
+
+
+_default_throttle = LoginThrottle()
+
+
+def default_throttle():
+    """Process-wide login throttle shared by every Streamlit session."""
+    return _default_throttle
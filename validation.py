@@ -0,0 +1,132 @@
+import re
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    # Arrow-backed strings run the pattern checks below in native code instead of per-row Python.
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:
+    TEXT_DTYPE = "string"
+
+
+# Patterns avoid look-arounds so they also run on Arrow's RE2 engine: the local part
+# may not start or end with a dot, and the whole value must match.
+EMAIL_PATTERN = r"[a-zA-Z0-9_+-](?:[a-zA-Z0-9_.+-]*[a-zA-Z0-9_+-])?@[a-zA-Z0-9-]+(?:\.[a-zA-Z]{2,})+"
+LETTER_PATTERN = r"[a-zA-Z]"
+DIGIT_PATTERN = r"[0-9]"
+SPECIAL_PATTERN = r"[@$!%*?&#]"
+PASSWORD_MIN_LENGTH = 8
+
+BLOCKED_HR_DOMAINS = frozenset(["gmail.com", "outlook.com", "hotmail.com", "yahoo.com"])
+INDUSTRIES = ["Software", "Finance", "Healthcare", "Education"]
+
+_email = re.compile(EMAIL_PATTERN)
+_letter = re.compile(LETTER_PATTERN)
+_digit = re.compile(DIGIT_PATTERN)
+_special = re.compile(SPECIAL_PATTERN)
+
+
+def is_valid_email(email):
+    """Validate email format."""
+    return bool(email) and _email.fullmatch(email) is not None and ".." not in email
+
+
+def is_valid_password(password):
+    """Validate password strength."""
+    return (
+        len(password or "") >= PASSWORD_MIN_LENGTH
+        and _letter.search(password) is not None
+        and _digit.search(password) is not None
+        and _special.search(password) is not None
+    )
+
+
+def email_domain(email):
+    """Lower-cased domain of an email address, or "" when it has none."""
+    return email.rpartition("@")[2].lower() if email and "@" in email else ""
+
+
+def is_blocked_hr_domain(email):
+    """True when an HR account would use a free-mail domain."""
+    return email_domain(email) in BLOCKED_HR_DOMAINS
+
+
+def as_text(values):
+    """Return `values` as a string Series with missing values as empty strings."""
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if series.dtype == TEXT_DTYPE:
+        return series.fillna("")
+    return series.astype(object).where(series.notna(), "").astype(str).astype(TEXT_DTYPE)
+
+
+def valid_emails(emails):
+    """Vectorized is_valid_email over a Series."""
+    emails = as_text(emails)
+    return (emails.str.fullmatch(EMAIL_PATTERN) & ~emails.str.contains("..", regex=False)).astype(bool)
+
+
+def valid_passwords(passwords):
+    """Vectorized is_valid_password over a Series."""
+    passwords = as_text(passwords)
+    return (
+        (passwords.str.len() >= PASSWORD_MIN_LENGTH)
+        & passwords.str.contains(LETTER_PATTERN)
+        & passwords.str.contains(DIGIT_PATTERN)
+        & passwords.str.contains(SPECIAL_PATTERN)
+    ).astype(bool)
+
+
+def blocked_hr_domains(emails):
+    """Vectorized is_blocked_hr_domain over a Series."""
+    emails = as_text(emails)
+    domains = emails.str.replace(r"^.*@", "", regex=True).str.lower().where(emails.str.contains("@", regex=False), "")
+    return domains.isin(BLOCKED_HR_DOMAINS).astype(bool)
+
+
+def validate_accounts(accounts, role="User"):
+    """Validate candidate accounts and return a DataFrame of `valid` and `reason` per row.
+
+    `accounts` is a DataFrame (or anything pandas can build one from) with
+    full_name, username, email, password and, for Users, industry columns. Each
+    row gets the first failing check as its reason; later repeats of a username
+    or email already used by a valid row are reported as duplicates.
+    """
+    frame = accounts if isinstance(accounts, pd.DataFrame) else pd.DataFrame(accounts)
+
+    def column(name):
+        return as_text(frame[name]) if name in frame else as_text(pd.Series([""] * len(frame), index=frame.index))
+
+    full_name = column("full_name").str.strip()
+    username = column("username").str.strip()
+    email = column("email").str.strip()
+    password = column("password")
+    industry = column("industry").str.strip()
+
+    checks = [
+        (
+            (full_name == "") | (username == "") | (email == "") | (password == ""),
+            "Full name, username, email and password are required.",
+        ),
+        (~valid_emails(email), "Invalid email format."),
+        (~valid_passwords(password), "Password does not meet the criteria."),
+    ]
+    if role == "User":
+        checks.append(((industry != "") & ~industry.isin(INDUSTRIES), "Invalid industry value."))
+    elif role == "HR":
+        checks.append((blocked_hr_domains(email), "HR accounts must use a company email domain."))
+
+    reason = pd.Series(None, index=frame.index, dtype=object)
+    for failed, message in checks:
+        reason = reason.mask(reason.isna() & failed.to_numpy(dtype=bool), message)
+
+    for values, message in [
+        (username.str.lower(), "Duplicate username in the import file."),
+        (email.str.lower(), "Duplicate email in the import file."),
+    ]:
+        passing = reason.isna()
+        duplicated = values[passing].duplicated().reindex(frame.index, fill_value=False)
+        reason = reason.mask(duplicated.to_numpy(dtype=bool), message)
+
+    valid = reason.isna()
+    return pd.DataFrame({"valid": valid.to_numpy(), "reason": reason.where(~valid, None).to_numpy()}, index=frame.index)